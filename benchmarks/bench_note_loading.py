@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for SQLiteNoteRepository.get_notes_by_user
+
+Seeds a throwaway database with users owning a growing number of notes
+(each with images, audio and a sketch stroke) and reports how many SQL
+statements and how much wall time one call to get_notes_by_user costs,
+next to the old one-query-per-child-table-per-note loading path.
+
+Run from the repository root:
+    python benchmarks/bench_note_loading.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from src.data.stroke_codec import encode_points
+
+NOTE_COUNTS = [10, 100, 500, 2000]
+IMAGES_PER_NOTE = 2
+AUDIO_PER_NOTE = 1
+SKETCH_POINTS_PER_NOTE = 20
+
+
+def seed_user(conn, username, note_count):
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, "x"))
+    user_id = cursor.lastrowid
+    for i in range(note_count):
+        cursor.execute(
+            "INSERT INTO notes (user_id, note_name, text_content) VALUES (?, ?, ?)",
+            (user_id, f"note {i}", "lorem ipsum " * 10)
+        )
+        note_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO images (note_id, image_path) VALUES (?, ?)",
+            [(note_id, f"img_{note_id}_{k}.png") for k in range(IMAGES_PER_NOTE)]
+        )
+        cursor.executemany(
+            "INSERT INTO audio (note_id, audio_path) VALUES (?, ?)",
+            [(note_id, f"audio_{note_id}_{k}.wav") for k in range(AUDIO_PER_NOTE)]
+        )
+        cursor.execute(
+            "INSERT INTO strokes (note_id, size, red, green, blue, opacity, point_count, points) "
+            "VALUES (?, 5, 0, 0, 0, 1, ?, ?)",
+            (note_id, SKETCH_POINTS_PER_NOTE,
+             encode_points([(float(k), float(k)) for k in range(SKETCH_POINTS_PER_NOTE)]))
+        )
+    conn.commit()
+    return user_id
+
+
+def load_per_note(repository, user_id):
+    """The previous loading strategy: three child queries for every note."""
+    conn = repository.db_manager.get_connection()
+    rows = conn.execute("SELECT id FROM notes WHERE user_id = ?", (user_id,)).fetchall()
+    for (note_id,) in rows:
+        repository.get_note_images(note_id)
+        repository.get_note_audio(note_id)
+        repository.get_note_sketch_points(note_id)
+
+
+def measure(conn, func):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    conn.set_trace_callback(None)
+    return len(statements), elapsed
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="notemaster-bench-")
+    os.chdir(workdir)  # The database lives at data/notes_app.db relative to cwd
+
+    from src.data.database_manager import SQLiteDatabaseManager
+    from src.data.note_repository import SQLiteNoteRepository
+
+    db_manager = SQLiteDatabaseManager()
+    repository = SQLiteNoteRepository()
+    conn = db_manager.get_connection()
+
+    print(f"{'notes':>6} | {'batched queries':>15} | {'batched ms':>10} | {'per-note queries':>16} | {'per-note ms':>11}")
+    print("-" * 72)
+    for note_count in NOTE_COUNTS:
+        user_id = seed_user(conn, f"bench_{note_count}", note_count)
+        batched_queries, batched_time = measure(conn, lambda: repository.get_notes_by_user(user_id))
+        legacy_queries, legacy_time = measure(conn, lambda: load_per_note(repository, user_id))
+        print(f"{note_count:>6} | {batched_queries:>15} | {batched_time * 1000:>10.1f} | "
+              f"{legacy_queries:>16} | {legacy_time * 1000:>11.1f}")
+
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,28 @@ Features:
 - Responsive layout
 """
 
+import argparse
 import sys
 from PyQt5.QtWidgets import QApplication
-from src.data.database_manager import SQLiteDatabaseManager
-from src.data.user_repository import SQLiteUserRepository
+from src.data.database_manager import DatabaseConfig
+from src.data.repository_factory import BACKENDS, configure_repositories, default_backend
+from src.services.media_gc import stop_all_collectors
 from src.services.user_service import UserService
 from src.ui.login_window import LoginWindow
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="NoteMaster")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="storage backend, 'memory' keeps all data in RAM for the session")
+    # Anything else (e.g. -style) is left for Qt
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
+
+
 def main():
+    args = parse_args(sys.argv)
+
     # Create QApplication
     app = QApplication(sys.argv)
     app.setApplicationName("NoteMaster")
@@ -33,10 +46,9 @@ def main():
     # Set application style
     app.setStyle("Fusion")
     
-    # Initialize database and services
-    db_manager = SQLiteDatabaseManager() # Singleton instance
-    user_repository = SQLiteUserRepository()
-    user_service = UserService(user_repository)
+    # Initialize storage and services
+    repositories = configure_repositories(args.backend, DatabaseConfig()) # SQLite is tuned through DatabaseConfig
+    user_service = UserService(repositories.user_repository)
     
     # Create and show login window, injecting dependencies
     login_window = LoginWindow(user_service)
@@ -47,9 +59,10 @@ def main():
     try:
         exit_code = app.exec_()
     finally:
-        # Close database connection on exit
-        db_manager.close()
-        print("Application closed. Database connection terminated.")
+        # Let media collection finish its batch, then close database connection on exit
+        stop_all_collectors()
+        repositories.close()
+        print(f"Application closed. {args.backend} storage released.")
     
     sys.exit(exit_code)
 
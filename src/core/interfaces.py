@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional # Make sure List is imported here
+from typing import TYPE_CHECKING, ContextManager, List, Optional, Tuple # Make sure List is imported here
 from dataclasses import dataclass, field # Import field for default_factory
 
+if TYPE_CHECKING:
+    from src.core.sketch_arrays import SketchArrays # Imports this module, so only for annotations
+
 
 @dataclass
 class SketchPoint:
@@ -14,6 +17,18 @@ class SketchPoint:
     opacity: float
 
 
+@dataclass
+class SketchStroke:
+    # One continuous pen stroke, the brush is stored once for all of its points
+    size: float
+    red: float
+    green: float
+    blue: float
+    opacity: float
+    points: List[Tuple[float, float]] = field(default_factory=list)
+    id: Optional[int] = None
+
+
 @dataclass
 class NoteImage:
     image_path: str
@@ -47,7 +62,7 @@ class Note:
     # Use default_factory to initialize mutable defaults like lists
     image_paths: List[NoteImage] = field(default_factory=list)
     audio_paths: List[NoteAudio] = field(default_factory=list)
-    sketch_points: List[SketchPoint] = field(default_factory=list)
+    sketch_strokes: List[SketchStroke] = field(default_factory=list)
 
     # The __post_init__ is not strictly necessary if using default_factory
     # but can be kept if there's other logic.
@@ -61,6 +76,41 @@ class Note:
     #         self.sketch_points = []
 
 
+@dataclass
+class NoteSummary:
+    # Lightweight projection of a note for list views, no media or sketch rows
+    id: int
+    user_id: int
+    note_name: str
+    preview: str = ""
+    is_secure: bool = False
+    image_count: int = 0
+    audio_count: int = 0
+    sketch_point_count: int = 0
+    updated_at: str = ""
+
+
+@dataclass(frozen=True)
+class NoteCursor:
+    # Position of the last note on a page, in (updated_at DESC, id DESC) order
+    updated_at: str
+    id: int
+
+
+@dataclass
+class NoteSummaryPage:
+    summaries: List[NoteSummary]
+    next_cursor: Optional[NoteCursor] = None  # None on the last page
+
+
+@dataclass
+class NoteSearchResult:
+    note_id: int
+    note_name: str
+    snippet: str  # Matched terms are wrapped in the repository's highlight markers
+    rank: float  # Lower is a better match
+
+
 @dataclass
 class User:
     id: int
@@ -93,10 +143,39 @@ class IUserRepository(ABC):
 
 
 class INoteRepository(ABC):
+    # Whether this repository is the record of every media file under the
+    # users folder. Only then may a file it does not reference be deleted.
+    owns_media_files = True
+
+    @abstractmethod
+    def transaction(self) -> ContextManager[None]:
+        """Unit of work: calls made inside the block are committed together"""
+        pass
+
     @abstractmethod
     def get_notes_by_user(self, user_id: int) -> List[Note]:
         pass
 
+    @abstractmethod
+    def get_note_summaries_by_user(self, user_id: int) -> List[NoteSummary]:
+        pass
+
+    @abstractmethod
+    def list_note_summaries(self, user_id: int, limit: int, after: Optional[NoteCursor] = None) -> NoteSummaryPage:
+        pass
+
+    @abstractmethod
+    def get_note_summaries_by_ids(self, user_id: int, note_ids: List[int]) -> List[NoteSummary]:
+        pass
+
+    @abstractmethod
+    def get_note_by_id(self, note_id: int, user_id: int) -> Optional[Note]:
+        pass
+
+    @abstractmethod
+    def search_notes(self, user_id: int, query: str, limit: int = 20, offset: int = 0) -> List[NoteSearchResult]:
+        pass
+
     @abstractmethod
     def create_note(self, user_id: int, note_name: str, text_content: str, is_secure: bool, secure_password: Optional[str]) -> Note:
         pass
@@ -138,10 +217,48 @@ class INoteRepository(ABC):
     def get_note_audio(self, note_id: int) -> List[NoteAudio]:
         pass
 
+    # Image and audio rows count as references to a stored media file
+
+    @abstractmethod
+    def register_media(self, path: str, sha256: str, size: int):
+        pass
+
+    @abstractmethod
+    def get_media_ref_count(self, path: str) -> int:
+        pass
+
+    @abstractmethod
+    def delete_media_if_unreferenced(self, path: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_referenced_media_paths(self) -> List[str]:
+        pass
+
+    @abstractmethod
+    def get_unreferenced_media_paths(self) -> List[str]:
+        pass
+
     @abstractmethod
     def add_sketch_point_to_note(self, note_id: int, point: SketchPoint):
         pass
 
+    @abstractmethod
+    def add_sketch_points_to_note(self, note_id: int, points: List[SketchPoint]):
+        pass
+
+    @abstractmethod
+    def add_stroke_to_note(self, note_id: int, stroke: SketchStroke) -> SketchStroke:
+        pass
+
+    @abstractmethod
+    def get_note_strokes(self, note_id: int) -> List[SketchStroke]:
+        pass
+
+    @abstractmethod
+    def get_note_sketch_arrays(self, note_id: int) -> "SketchArrays":
+        pass
+
     @abstractmethod
     def clear_sketch_points_for_note(self, note_id: int):
         pass
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.core.interfaces import SketchStroke
+
+UNSAVED_STROKE_ID = -1  # stroke_ids entry of a stroke that has no database id yet
+
+
+@dataclass
+class SketchArrays:
+    """
+    A note's sketch as columns instead of objects: every stroke's points back
+    to back in two float32 arrays, with offsets marking where each stroke
+    starts. Stroke i owns points offsets[i]:offsets[i + 1]. Brushes are per
+    stroke, as in SketchStroke, so size and colour have one row per stroke.
+
+    Costs 8 bytes per point, and bulk operations (bounds, translate, scale)
+    run over whole columns instead of looping over points in Python.
+    """
+
+    x: np.ndarray  # float32, one entry per point
+    y: np.ndarray  # float32, one entry per point
+    offsets: np.ndarray  # int64, stroke_count + 1 entries, starts at 0
+    size: np.ndarray  # float32, one entry per stroke
+    color: np.ndarray  # float32, (stroke_count, 4) RGBA in 0..1
+    stroke_ids: np.ndarray  # int64, one entry per stroke
+
+    @classmethod
+    def empty(cls) -> "SketchArrays":
+        return cls.allocate(0, 0)
+
+    @classmethod
+    def allocate(cls, stroke_count: int, point_count: int) -> "SketchArrays":
+        """Uninitialised columns for filling in place, offsets[0] is already 0"""
+        offsets = np.empty(stroke_count + 1, dtype=np.int64)
+        offsets[0] = 0
+        return cls(
+            x=np.empty(point_count, dtype=np.float32),
+            y=np.empty(point_count, dtype=np.float32),
+            offsets=offsets,
+            size=np.empty(stroke_count, dtype=np.float32),
+            color=np.empty((stroke_count, 4), dtype=np.float32),
+            stroke_ids=np.empty(stroke_count, dtype=np.int64)
+        )
+
+    @classmethod
+    def from_strokes(cls, strokes: Sequence[SketchStroke]) -> "SketchArrays":
+        counts = np.fromiter((len(stroke.points) for stroke in strokes), dtype=np.int64, count=len(strokes))
+        sketch = cls.allocate(len(strokes), int(counts.sum()))
+        np.cumsum(counts, out=sketch.offsets[1:])
+        coordinates = chain.from_iterable(chain.from_iterable(stroke.points for stroke in strokes))
+        points = np.fromiter(coordinates, dtype=np.float32, count=2 * sketch.point_count)
+        sketch.x[:] = points[0::2]
+        sketch.y[:] = points[1::2]
+        for index, stroke in enumerate(strokes):
+            sketch.size[index] = stroke.size
+            sketch.color[index] = (stroke.red, stroke.green, stroke.blue, stroke.opacity)
+            sketch.stroke_ids[index] = stroke.id if stroke.id is not None else UNSAVED_STROKE_ID
+        return sketch
+
+    def to_strokes(self) -> List[SketchStroke]:
+        strokes = []
+        for index in range(self.stroke_count):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            red, green, blue, opacity = self.color[index].tolist()
+            stroke_id = int(self.stroke_ids[index])
+            strokes.append(SketchStroke(
+                float(self.size[index]), red, green, blue, opacity,
+                points=list(zip(self.x[start:end].tolist(), self.y[start:end].tolist())),
+                id=stroke_id if stroke_id != UNSAVED_STROKE_ID else None
+            ))
+        return strokes
+
+    @property
+    def stroke_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def point_count(self) -> int:
+        return len(self.x)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (self.x, self.y, self.offsets, self.size, self.color, self.stroke_ids))
+
+    def stroke_points(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of stroke index's x and y values, writing to them edits the sketch"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.x[start:end], self.y[start:end]
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """(min x, min y, max x, max y) over all points, None for an empty sketch"""
+        if not self.point_count:
+            return None
+        return float(self.x.min()), float(self.y.min()), float(self.x.max()), float(self.y.max())
+
+    def translate(self, dx: float, dy: float):
+        self.x += np.float32(dx)
+        self.y += np.float32(dy)
+
+    def scale(self, sx: float, sy: Optional[float] = None, origin: Tuple[float, float] = (0.0, 0.0)):
+        """Scale about origin in place; brush sizes follow the geometric mean of the factors"""
+        sy = sx if sy is None else sy
+        ox, oy = np.float32(origin[0]), np.float32(origin[1])
+        self.x -= ox
+        self.x *= np.float32(sx)
+        self.x += ox
+        self.y -= oy
+        self.y *= np.float32(sy)
+        self.y += oy
+        self.size *= np.float32(np.sqrt(abs(sx * sy)))
@@ -0,0 +1,87 @@
+import math
+from typing import Iterator, List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+SIMPLIFY_TOLERANCE_RATIO = 0.2  # Allowed deviation per pixel of brush width
+MIN_SIMPLIFY_TOLERANCE = 0.5  # Mouse input is integer pixels, below this it is all signal
+CORNER_ANGLE_DEGREES = 70  # Sharper turns stay corners instead of being rounded off
+
+_CORNER_COS = math.cos(math.radians(CORNER_ANGLE_DEGREES))
+
+
+def simplify_tolerance(brush_size: float) -> float:
+    """How far a simplified stroke may stray from the captured one, wider brushes hide more"""
+    return max(MIN_SIMPLIFY_TOLERANCE, brush_size * SIMPLIFY_TOLERANCE_RATIO)
+
+
+def simplify_points(points: Sequence[Point], tolerance: float) -> List[Point]:
+    """
+    Ramer-Douglas-Peucker: drop every point that lies within tolerance of
+    the line through the points kept around it. The first and last points
+    always stay. Iterative, so very long strokes cannot hit the recursion
+    limit.
+    """
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    spans = [(0, count - 1)]
+    while spans:
+        first, last = spans.pop()
+        farthest, farthest_sq = _farthest_point(points, first, last)
+        if farthest_sq > tolerance_sq:
+            keep[farthest] = True
+            spans.append((first, farthest))
+            spans.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _farthest_point(points: Sequence[Point], first: int, last: int) -> Tuple[int, float]:
+    # Distance to the segment, not the infinite line, so a stroke that
+    # doubles back keeps its turning point
+    x1, y1 = points[first]
+    dx, dy = points[last][0] - x1, points[last][1] - y1
+    length_sq = dx * dx + dy * dy
+    farthest, farthest_sq = first, -1.0
+    for index in range(first + 1, last):
+        px, py = points[index][0] - x1, points[index][1] - y1
+        t = (px * dx + py * dy) / length_sq if length_sq else 0.0
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+        ex, ey = px - t * dx, py - t * dy
+        distance_sq = ex * ex + ey * ey
+        if distance_sq > farthest_sq:
+            farthest, farthest_sq = index, distance_sq
+    return farthest, farthest_sq
+
+
+def catmull_rom_segments(points: Sequence[Point]) -> Iterator[Tuple[Point, Point, Point]]:
+    """
+    Cubic Bezier segments (control 1, control 2, end) of the uniform
+    Catmull-Rom spline through points, starting at points[0]. The curve
+    passes through every point, so simplified strokes render round again;
+    turns sharper than CORNER_ANGLE_DEGREES are kept as corners.
+    """
+    tangents = [_tangent(points, index) for index in range(len(points))]
+    for index in range(len(points) - 1):
+        (x1, y1), (tx1, ty1) = points[index], tangents[index]
+        (x2, y2), (tx2, ty2) = points[index + 1], tangents[index + 1]
+        yield (x1 + tx1, y1 + ty1), (x2 - tx2, y2 - ty2), (x2, y2)
+
+
+def _tangent(points: Sequence[Point], index: int) -> Point:
+    # A sixth of the chord between the neighbours, the Bezier form of the
+    # Catmull-Rom tangent; the end points use their only neighbour
+    x0, y0 = points[max(index - 1, 0)]
+    x1, y1 = points[index]
+    x2, y2 = points[min(index + 1, len(points) - 1)]
+    ax, ay, bx, by = x1 - x0, y1 - y0, x2 - x1, y2 - y1
+    if ax * bx + ay * by < _CORNER_COS * math.hypot(ax, ay) * math.hypot(bx, by):
+        return 0.0, 0.0
+    return (x2 - x0) / 6, (y2 - y0) / 6
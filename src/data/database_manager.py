@@ -1,91 +1,89 @@
 import sqlite3
 import os
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
 from src.core.interfaces import IDatabaseManager
+from src.data.migrations import migrate
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+@dataclass
+class DatabaseConfig:
+    db_path: str = os.path.join("data", "notes_app.db")
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"  # Safe with WAL, only the last commits may roll back on power loss
+    cache_size_kib: int = 16 * 1024  # Page cache per connection
+    mmap_size: int = 64 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+
+    def __post_init__(self):
+        self.journal_mode = self.journal_mode.upper()
+        self.synchronous = self.synchronous.upper()
+        if self.journal_mode not in JOURNAL_MODES:
+            raise ValueError(f"Unsupported journal_mode '{self.journal_mode}'")
+        if self.synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported synchronous mode '{self.synchronous}'")
 
 
 class SQLiteDatabaseManager(IDatabaseManager):
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, config: Optional[DatabaseConfig] = None):
         if cls._instance is None:
             cls._instance = super(SQLiteDatabaseManager, cls).__new__(cls)
-            cls._instance._initialize()
+            cls._instance._initialize(config or DatabaseConfig())
+        elif config is not None and config != cls._instance.config:
+            raise ValueError("SQLiteDatabaseManager is already initialized with a different configuration.")
         return cls._instance
 
-    def _initialize(self):
-        self.db_path = "data/notes_app.db"
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = sqlite3.connect(self.db_path)
-        self.create_tables()
-
-    def create_tables(self):
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            note_name TEXT NOT NULL,
-            text_content TEXT DEFAULT '',
-            is_secure INTEGER DEFAULT 0,
-            secure_password TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id),
-            UNIQUE (user_id, note_name)
-        )
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS images (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            note_id INTEGER NOT NULL,
-            image_path TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (note_id) REFERENCES notes (id)
-        )
-        """)
-
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS audio (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            note_id INTEGER NOT NULL,
-            audio_path TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (note_id) REFERENCES notes (id)
-        )
-        """)
+    def _initialize(self, config: DatabaseConfig):
+        self.config = config
+        db_dir = os.path.dirname(config.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # Every thread gets its own connection, so reader threads never queue
+        # behind the writer on a shared connection object.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.apply_migrations()
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sketch_points (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            note_id INTEGER NOT NULL,
-            x REAL NOT NULL,
-            y REAL NOT NULL,
-            size REAL NOT NULL,
-            red REAL NOT NULL,
-            green REAL NOT NULL,
-            blue REAL NOT NULL,
-            opacity REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (note_id) REFERENCES notes (id)
+    def _open_connection(self) -> sqlite3.Connection:
+        # check_same_thread is off only so close() can shut down every thread's
+        # connection, each connection is still used by a single thread.
+        conn = sqlite3.connect(
+            self.config.db_path,
+            timeout=self.config.busy_timeout_ms / 1000,
+            check_same_thread=False
         )
-        """)
+        conn.execute(f"PRAGMA journal_mode = {self.config.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.config.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.config.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.config.mmap_size)}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.config.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
 
-        self.conn.commit()
+    def apply_migrations(self) -> int:
+        """Upgrade the schema to the latest version, returns the version found on disk"""
+        return migrate(self.get_connection())
 
-    def get_connection(self):
-        return self.conn
+    def get_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
 
     def close(self):
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
\ No newline at end of file
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        # Connections of other threads are gone too, they reconnect on next use
+        self._local = threading.local()
\ No newline at end of file
@@ -0,0 +1,457 @@
+import bisect
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.core.interfaces import INoteRepository, IUserRepository, Note, NoteSummary, NoteSummaryPage, NoteCursor, NoteSearchResult, NoteImage, NoteAudio, SketchPoint, SketchStroke, User
+from src.data.note_repository import PREVIEW_LENGTH, SNIPPET_HIGHLIGHT_START, SNIPPET_HIGHLIGHT_END, SNIPPET_TOKENS
+from src.core.sketch_arrays import SketchArrays
+from src.data.stroke_codec import split_points_into_strokes, stroke_to_points
+
+# Roughly what the FTS5 unicode61 tokenizer treats as a word
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+NAME_RANK_WEIGHT = 10.0  # Same weighting as bm25(notes_fts, 10.0, 1.0)
+
+
+def _timestamp() -> str:
+    # Same format and time zone as SQLite's CURRENT_TIMESTAMP
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _copy_stroke(stroke: SketchStroke) -> SketchStroke:
+    return replace(stroke, points=list(stroke.points))
+
+
+@dataclass
+class _NoteRecord:
+    id: int
+    user_id: int
+    note_name: str
+    text_content: str
+    is_secure: bool
+    secure_password: Optional[str]
+    updated_at: str
+    images: List[str] = field(default_factory=list)
+    audio: List[str] = field(default_factory=list)
+    strokes: List[SketchStroke] = field(default_factory=list)
+
+    @property
+    def order_key(self) -> Tuple[str, int]:
+        return (self.updated_at, self.id)
+
+
+@dataclass
+class _MediaRecord:
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    ref_count: int = 0
+
+
+class InMemoryStore:
+    """
+    Tables shared by the in-memory user and note repositories. Every access
+    holds one re-entrant lock, a transaction keeps holding it until the
+    outermost block ends, so units of work are serialized like BEGIN
+    IMMEDIATE serializes writers on the SQLite backend.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users: Dict[int, User] = {}
+        self.user_ids_by_name: Dict[str, int] = {}
+        self.notes: Dict[int, _NoteRecord] = {}
+        self.note_ids_by_name: Dict[Tuple[int, str], int] = {}
+        # Per user (updated_at, id) keys in ascending order, the in-memory
+        # counterpart of idx_notes_user_updated
+        self.note_order: Dict[int, List[Tuple[str, int]]] = {}
+        # path -> media file row, ref_count follows image and audio references
+        self.media: Dict[str, _MediaRecord] = {}
+        self._next_ids = {"users": 1, "notes": 1, "strokes": 1}
+        self._undo_log: Optional[List[Callable[[], None]]] = None
+
+    def next_id(self, table: str) -> int:
+        value = self._next_ids[table]
+        self._next_ids[table] = value + 1
+        return value
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self.lock:
+            outermost = self._undo_log is None
+            if outermost:
+                self._undo_log = []
+            try:
+                yield
+            except BaseException:
+                if outermost:
+                    undo_log, self._undo_log = self._undo_log, None
+                    for undo in reversed(undo_log):
+                        undo()
+                raise
+            if outermost:
+                self._undo_log = None
+
+    def on_rollback(self, undo: Callable[[], None]):
+        """Register how to revert a change made while the lock is held"""
+        if self._undo_log is not None:
+            self._undo_log.append(undo)
+
+    def change_media_refs(self, paths: List[str], delta: int):
+        # What the images/audio reference count triggers do on SQLite
+        created = [path for path in dict.fromkeys(paths) if path not in self.media]
+        for path in paths:
+            self.media.setdefault(path, _MediaRecord()).ref_count += delta
+        self.on_rollback(lambda: self._revert_media_refs(paths, delta, created))
+
+    def _revert_media_refs(self, paths: List[str], delta: int, created: List[str]):
+        for path in paths:
+            self.media[path].ref_count -= delta
+        for path in created:
+            del self.media[path]
+
+
+class InMemoryUserRepository(IUserRepository):
+    def __init__(self, store: Optional[InMemoryStore] = None):
+        self.store = store if store is not None else InMemoryStore()
+
+    def get_all_users(self) -> List[User]:
+        with self.store.lock:
+            return [replace(user) for user in self.store.users.values()]
+
+    def get_user_by_username(self, username: str) -> Optional[User]:
+        with self.store.lock:
+            user_id = self.store.user_ids_by_name.get(username)
+            return replace(self.store.users[user_id]) if user_id is not None else None
+
+    def add_user(self, username: str, hashed_password: str) -> User:
+        store = self.store
+        with store.lock:
+            if username in store.user_ids_by_name:
+                raise ValueError(f"Username \'{username}\' already exists")
+            user = User(store.next_id("users"), username, hashed_password)
+            store.users[user.id] = user
+            store.user_ids_by_name[username] = user.id
+            store.on_rollback(lambda: self._remove_user(user))
+            return replace(user)
+
+    def _remove_user(self, user: User):
+        del self.store.users[user.id]
+        del self.store.user_ids_by_name[user.username]
+
+
+class InMemoryNoteRepository(INoteRepository):
+    """
+    Dict-backed INoteRepository with the same observable behaviour as
+    SQLiteNoteRepository: unique note names per user, cascading deletes,
+    rollback on failed units of work, keyset paging and prefix search that
+    skips secure notes. Callers always get copies, never the stored objects.
+    """
+
+    # The users folder also holds the database's media, which this
+    # repository knows nothing about
+    owns_media_files = False
+
+    def __init__(self, store: Optional[InMemoryStore] = None):
+        self.store = store if store is not None else InMemoryStore()
+
+    def transaction(self) -> Iterator[None]:
+        return self.store.transaction()
+
+    def get_notes_by_user(self, user_id: int) -> List[Note]:
+        with self.store.lock:
+            records = [self.store.notes[note_id] for _, note_id in self.store.note_order.get(user_id, [])]
+            return [self._record_to_note(record) for record in sorted(records, key=lambda record: record.id)]
+
+    def get_note_summaries_by_user(self, user_id: int) -> List[NoteSummary]:
+        with self.store.lock:
+            keys = self.store.note_order.get(user_id, [])
+            return [self._record_to_summary(self.store.notes[note_id]) for _, note_id in reversed(keys)]
+
+    def list_note_summaries(self, user_id: int, limit: int, after: Optional[NoteCursor] = None) -> NoteSummaryPage:
+        with self.store.lock:
+            keys = self.store.note_order.get(user_id, [])
+            end = bisect.bisect_left(keys, (after.updated_at, after.id)) if after is not None else len(keys)
+            # One extra key tells whether another page exists
+            window = keys[max(0, end - limit - 1):end][::-1]
+            summaries = [self._record_to_summary(self.store.notes[note_id]) for _, note_id in window[:limit]]
+        next_cursor = None
+        if len(window) > limit:
+            last = summaries[-1]
+            next_cursor = NoteCursor(last.updated_at, last.id)
+        return NoteSummaryPage(summaries, next_cursor)
+
+    def get_note_summaries_by_ids(self, user_id: int, note_ids: List[int]) -> List[NoteSummary]:
+        with self.store.lock:
+            records = [self.store.notes.get(note_id) for note_id in dict.fromkeys(note_ids)]
+            records = [record for record in records if record is not None and record.user_id == user_id]
+            records.sort(key=lambda record: record.order_key, reverse=True)
+            return [self._record_to_summary(record) for record in records]
+
+    def get_note_by_id(self, note_id: int, user_id: int) -> Optional[Note]:
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is None or record.user_id != user_id:
+                return None
+            return self._record_to_note(record)
+
+    def search_notes(self, user_id: int, query: str, limit: int = 20, offset: int = 0) -> List[NoteSearchResult]:
+        terms = [term.lower() for term in _TOKEN_PATTERN.findall(query)]
+        if not terms:
+            return []
+        with self.store.lock:
+            records = [self.store.notes[note_id] for _, note_id in self.store.note_order.get(user_id, [])]
+        # Every term must prefix-match a word in the name or the content, a
+        # name hit counts NAME_RANK_WEIGHT times more. Lower scores rank
+        # first, as with bm25().
+        results = []
+        for record in records:
+            if record.is_secure:
+                continue
+            name_words = [word.lower() for word in _TOKEN_PATTERN.findall(record.note_name)]
+            content_words = [word.lower() for word in _TOKEN_PATTERN.findall(record.text_content)]
+            name_hits = content_hits = 0
+            for term in terms:
+                term_name_hits = sum(1 for word in name_words if word.startswith(term))
+                term_content_hits = sum(1 for word in content_words if word.startswith(term))
+                if not term_name_hits and not term_content_hits:
+                    break
+                name_hits += term_name_hits
+                content_hits += term_content_hits
+            else:
+                score = -(NAME_RANK_WEIGHT * name_hits + content_hits)
+                source = record.note_name if name_hits >= content_hits else record.text_content
+                results.append(NoteSearchResult(record.id, record.note_name, self._snippet(source, terms), score))
+        results.sort(key=lambda result: (result.rank, result.note_id))
+        return results[offset:offset + limit]
+
+    @staticmethod
+    def _snippet(text: str, terms: List[str]) -> str:
+        words = list(_TOKEN_PATTERN.finditer(text))
+        hits = [i for i, word in enumerate(words) if any(word.group().lower().startswith(term) for term in terms)]
+        if not hits:
+            return text
+        # Like FTS5, keep the start of the text when the first hit fits in the window
+        start = 0 if hits[0] < SNIPPET_TOKENS else max(0, min(hits[0] - SNIPPET_TOKENS // 4, len(words) - SNIPPET_TOKENS))
+        end = min(len(words), start + SNIPPET_TOKENS)
+        parts = ["..."] if start > 0 else []
+        position = words[start].start()
+        for i in range(start, end):
+            word = words[i]
+            parts.append(text[position:word.start()])
+            if i in hits:
+                parts.append(f"{SNIPPET_HIGHLIGHT_START}{word.group()}{SNIPPET_HIGHLIGHT_END}")
+            else:
+                parts.append(word.group())
+            position = word.end()
+        if end < len(words):
+            parts.append("...")
+        return "".join(parts)
+
+    @staticmethod
+    def _record_to_note(record: _NoteRecord) -> Note:
+        return Note(
+            id=record.id,
+            user_id=record.user_id,
+            note_name=record.note_name,
+            text_content=record.text_content,
+            is_secure=record.is_secure,
+            secure_password=record.secure_password,
+            image_paths=[NoteImage(path) for path in record.images],
+            audio_paths=[NoteAudio(path) for path in record.audio],
+            sketch_strokes=[_copy_stroke(stroke) for stroke in record.strokes]
+        )
+
+    @staticmethod
+    def _record_to_summary(record: _NoteRecord) -> NoteSummary:
+        preview = record.text_content[:PREVIEW_LENGTH]
+        return NoteSummary(
+            id=record.id,
+            user_id=record.user_id,
+            note_name=record.note_name,
+            preview=preview + "..." if len(record.text_content) > PREVIEW_LENGTH else preview,
+            is_secure=record.is_secure,
+            image_count=len(record.images),
+            audio_count=len(record.audio),
+            sketch_point_count=sum(len(stroke.points) for stroke in record.strokes),
+            updated_at=record.updated_at
+        )
+
+    def create_note(self, user_id: int, note_name: str, text_content: str, is_secure: bool, secure_password: Optional[str]) -> Note:
+        store = self.store
+        with store.lock:
+            if user_id not in store.users:
+                raise ValueError(f"User {user_id} does not exist.")
+            if (user_id, note_name) in store.note_ids_by_name:
+                raise ValueError(f"Note name \'{note_name}\' already exists for this user.")
+            record = _NoteRecord(store.next_id("notes"), user_id, note_name, text_content or "",
+                                 bool(is_secure), secure_password, _timestamp())
+            self._insert_record(record)
+            store.on_rollback(lambda: self._remove_record(record))
+        return Note(record.id, user_id, note_name, text_content, is_secure, secure_password, [], [], [])
+
+    def _insert_record(self, record: _NoteRecord):
+        self.store.notes[record.id] = record
+        self.store.note_ids_by_name[(record.user_id, record.note_name)] = record.id
+        bisect.insort(self.store.note_order.setdefault(record.user_id, []), record.order_key)
+
+    def _remove_record(self, record: _NoteRecord):
+        del self.store.notes[record.id]
+        del self.store.note_ids_by_name[(record.user_id, record.note_name)]
+        keys = self.store.note_order[record.user_id]
+        del keys[bisect.bisect_left(keys, record.order_key)]
+
+    def _set_content(self, record: _NoteRecord, text_content: str, updated_at: str):
+        keys = self.store.note_order[record.user_id]
+        del keys[bisect.bisect_left(keys, record.order_key)]
+        record.text_content = text_content
+        record.updated_at = updated_at
+        bisect.insort(keys, record.order_key)
+
+    def update_note_content(self, note_id: int, text_content: str):
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is None:
+                return
+            old_content, old_updated_at = record.text_content, record.updated_at
+            self._set_content(record, text_content, _timestamp())
+            self.store.on_rollback(lambda: self._set_content(record, old_content, old_updated_at))
+
+    def delete_note(self, note_id: int):
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is None:
+                return
+            # Media and strokes live on the record, so they go (and come back
+            # on rollback) with it
+            self._remove_record(record)
+            self.store.on_rollback(lambda: self._insert_record(record))
+            self.store.change_media_refs(record.images + record.audio, -1)
+
+    def note_name_exists(self, user_id: int, note_name: str) -> bool:
+        with self.store.lock:
+            return (user_id, note_name) in self.store.note_ids_by_name
+
+    def _require_note(self, note_id: int) -> _NoteRecord:
+        record = self.store.notes.get(note_id)
+        if record is None:
+            raise ValueError(f"Note {note_id} does not exist.")
+        return record
+
+    def _append_path(self, paths: List[str], path: str):
+        paths.append(path)
+        self.store.on_rollback(paths.pop)
+        self.store.change_media_refs([path], 1)
+
+    def _remove_path(self, paths: List[str], path: str):
+        previous = list(paths)
+        paths[:] = [existing for existing in paths if existing != path]
+        self.store.on_rollback(lambda: paths.__setitem__(slice(None), previous))
+        self.store.change_media_refs([path] * (len(previous) - len(paths)), -1)
+
+    def add_image_to_note(self, note_id: int, image_path: str):
+        with self.store.lock:
+            self._append_path(self._require_note(note_id).images, image_path)
+
+    def remove_image_from_note(self, note_id: int, image_path: str):
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is not None:
+                self._remove_path(record.images, image_path)
+
+    def get_note_images(self, note_id: int) -> List[NoteImage]:
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            return [NoteImage(path) for path in record.images] if record is not None else []
+
+    def add_audio_to_note(self, note_id: int, audio_path: str):
+        with self.store.lock:
+            self._append_path(self._require_note(note_id).audio, audio_path)
+
+    def remove_audio_from_note(self, note_id: int, audio_path: str):
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is not None:
+                self._remove_path(record.audio, audio_path)
+
+    def get_note_audio(self, note_id: int) -> List[NoteAudio]:
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            return [NoteAudio(path) for path in record.audio] if record is not None else []
+
+    def register_media(self, path: str, sha256: str, size: int):
+        with self.store.lock:
+            media = self.store.media.get(path)
+            if media is None:
+                self.store.media[path] = _MediaRecord(sha256, size)
+                self.store.on_rollback(lambda: self.store.media.pop(path))
+            elif media.sha256 is None:
+                media.sha256, media.size = sha256, size
+
+    def get_media_ref_count(self, path: str) -> int:
+        with self.store.lock:
+            media = self.store.media.get(path)
+            return media.ref_count if media is not None else 0
+
+    def delete_media_if_unreferenced(self, path: str) -> bool:
+        with self.store.lock:
+            media = self.store.media.get(path)
+            if media is None or media.ref_count > 0:
+                return False
+            del self.store.media[path]
+            self.store.on_rollback(lambda: self.store.media.__setitem__(path, media))
+            return True
+
+    def get_referenced_media_paths(self) -> List[str]:
+        with self.store.lock:
+            return [path for path, media in self.store.media.items() if media.ref_count > 0]
+
+    def get_unreferenced_media_paths(self) -> List[str]:
+        with self.store.lock:
+            return [path for path, media in self.store.media.items() if media.ref_count <= 0]
+
+    def add_sketch_point_to_note(self, note_id: int, point: SketchPoint):
+        self.add_sketch_points_to_note(note_id, [point])
+
+    def add_sketch_points_to_note(self, note_id: int, points: List[SketchPoint]):
+        if not points:
+            return
+        with self.store.lock:
+            self._append_strokes(self._require_note(note_id), split_points_into_strokes(points))
+
+    def add_stroke_to_note(self, note_id: int, stroke: SketchStroke) -> SketchStroke:
+        with self.store.lock:
+            stored = self._append_strokes(self._require_note(note_id), [stroke])[0]
+        stroke.id = stored.id
+        return stroke
+
+    def _append_strokes(self, record: _NoteRecord, strokes: List[SketchStroke]) -> List[SketchStroke]:
+        stored = [replace(stroke, points=list(stroke.points), id=self.store.next_id("strokes")) for stroke in strokes]
+        previous_count = len(record.strokes)
+        record.strokes.extend(stored)
+        self.store.on_rollback(lambda: record.strokes.__delitem__(slice(previous_count, None)))
+        return stored
+
+    def clear_sketch_points_for_note(self, note_id: int):
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            if record is None:
+                return
+            previous = record.strokes
+            record.strokes = []
+            self.store.on_rollback(lambda: setattr(record, "strokes", previous))
+
+    def get_note_strokes(self, note_id: int) -> List[SketchStroke]:
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            return [_copy_stroke(stroke) for stroke in record.strokes] if record is not None else []
+
+    def get_note_sketch_arrays(self, note_id: int) -> SketchArrays:
+        with self.store.lock:
+            record = self.store.notes.get(note_id)
+            return SketchArrays.from_strokes(record.strokes) if record is not None else SketchArrays.empty()
+
+    def get_note_sketch_points(self, note_id: int) -> List[SketchPoint]:
+        return [point for stroke in self.get_note_strokes(note_id) for point in stroke_to_points(stroke)]
@@ -0,0 +1,321 @@
+import sqlite3
+from typing import Callable, List
+from src.core.interfaces import SketchPoint
+from src.data.stroke_codec import encode_points, split_points_into_strokes
+
+# Schema changes are applied in order, the database records how many of them
+# it has seen in PRAGMA user_version. Append new migrations, never edit or
+# reorder ones that have shipped.
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def _create_base_schema(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        note_name TEXT NOT NULL,
+        text_content TEXT DEFAULT '',
+        is_secure INTEGER DEFAULT 0,
+        secure_password TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        UNIQUE (user_id, note_name)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        image_path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (note_id) REFERENCES notes (id)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS audio (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        audio_path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (note_id) REFERENCES notes (id)
+    )
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS sketch_points (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        x REAL NOT NULL,
+        y REAL NOT NULL,
+        size REAL NOT NULL,
+        red REAL NOT NULL,
+        green REAL NOT NULL,
+        blue REAL NOT NULL,
+        opacity REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (note_id) REFERENCES notes (id)
+    )
+    """)
+
+
+def _add_strokes(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS strokes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        size REAL NOT NULL,
+        red REAL NOT NULL,
+        green REAL NOT NULL,
+        blue REAL NOT NULL,
+        opacity REAL NOT NULL,
+        point_count INTEGER NOT NULL,
+        points BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (note_id) REFERENCES notes (id)
+    )
+    """)
+
+    # Convert legacy one-row-per-point sketches into packed stroke rows
+    cursor.execute("SELECT DISTINCT note_id FROM sketch_points")
+    for (note_id,) in cursor.fetchall():
+        cursor.execute("""
+            SELECT x, y, size, red, green, blue, opacity
+            FROM sketch_points
+            WHERE note_id = ?
+            ORDER BY id
+        """, (note_id,))
+        points = [SketchPoint(*row) for row in cursor.fetchall()]
+        cursor.executemany("""
+            INSERT INTO strokes
+            (note_id, size, red, green, blue, opacity, point_count, points)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (note_id, stroke.size, stroke.red, stroke.green, stroke.blue, stroke.opacity,
+             len(stroke.points), encode_points(stroke.points))
+            for stroke in split_points_into_strokes(points)
+        ])
+        cursor.execute("DELETE FROM sketch_points WHERE note_id = ?", (note_id,))
+
+
+def _rebuild_with_cascade(conn: sqlite3.Connection, table: str, columns_sql: str, columns: List[str]):
+    """
+    SQLite cannot add ON DELETE CASCADE to an existing foreign key, so the
+    table is copied into a new definition and swapped in. Rows whose note no
+    longer exists are dropped on the way.
+    """
+    column_list = ", ".join(columns)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    CREATE TABLE {table}_new (
+        {columns_sql},
+        FOREIGN KEY (note_id) REFERENCES notes (id) ON DELETE CASCADE
+    )
+    """)
+    cursor.execute(f"""
+        INSERT INTO {table}_new ({column_list})
+        SELECT {column_list} FROM {table}
+        WHERE note_id IN (SELECT id FROM notes)
+    """)
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_note_id ON {table} (note_id)")
+
+
+def _add_note_foreign_key_indexes_and_cascades(conn: sqlite3.Connection):
+    _rebuild_with_cascade(conn, "images", """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        image_path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP""",
+        ["id", "note_id", "image_path", "created_at"])
+
+    _rebuild_with_cascade(conn, "audio", """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        audio_path TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP""",
+        ["id", "note_id", "audio_path", "created_at"])
+
+    _rebuild_with_cascade(conn, "sketch_points", """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        x REAL NOT NULL,
+        y REAL NOT NULL,
+        size REAL NOT NULL,
+        red REAL NOT NULL,
+        green REAL NOT NULL,
+        blue REAL NOT NULL,
+        opacity REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP""",
+        ["id", "note_id", "x", "y", "size", "red", "green", "blue", "opacity", "created_at"])
+
+    _rebuild_with_cascade(conn, "strokes", """
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        size REAL NOT NULL,
+        red REAL NOT NULL,
+        green REAL NOT NULL,
+        blue REAL NOT NULL,
+        opacity REAL NOT NULL,
+        point_count INTEGER NOT NULL,
+        points BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP""",
+        ["id", "note_id", "size", "red", "green", "blue", "opacity", "point_count", "points", "created_at"])
+
+
+def _add_notes_full_text_search(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    # The index keeps its own copy of the text with rowid = notes.id, so rows
+    # can be removed by id alone. Secure notes are never indexed.
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        note_name,
+        text_content,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """)
+    cursor.execute("""
+        INSERT INTO notes_fts (rowid, note_name, text_content)
+        SELECT id, note_name, COALESCE(text_content, '') FROM notes
+        WHERE is_secure = 0
+    """)
+
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_insert AFTER INSERT ON notes
+    WHEN new.is_secure = 0
+    BEGIN
+        INSERT INTO notes_fts (rowid, note_name, text_content)
+        VALUES (new.id, new.note_name, COALESCE(new.text_content, ''));
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_delete AFTER DELETE ON notes
+    BEGIN
+        DELETE FROM notes_fts WHERE rowid = old.id;
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS notes_fts_after_update
+    AFTER UPDATE OF note_name, text_content, is_secure ON notes
+    BEGIN
+        DELETE FROM notes_fts WHERE rowid = old.id;
+        INSERT INTO notes_fts (rowid, note_name, text_content)
+        SELECT new.id, new.note_name, COALESCE(new.text_content, '')
+        WHERE new.is_secure = 0;
+    END
+    """)
+
+
+def _add_note_listing_index(conn: sqlite3.Connection):
+    # Serves keyset pagination of a user's notes, newest first
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_notes_user_updated
+        ON notes (user_id, updated_at DESC, id DESC)
+    """)
+
+
+def _add_media_reference_counts(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    # One row per stored media file, ref_count is the number of image and
+    # audio rows pointing at it and is kept current by the triggers below.
+    # Files stored before content addressing have no hash or size.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS media_files (
+        path TEXT PRIMARY KEY,
+        sha256 TEXT,
+        size INTEGER,
+        ref_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO media_files (path, ref_count)
+        SELECT path, COUNT(*) FROM (
+            SELECT image_path AS path FROM images
+            UNION ALL
+            SELECT audio_path FROM audio
+        )
+        GROUP BY path
+    """)
+
+    for table, column in (("images", "image_path"), ("audio", "audio_path")):
+        # Delete triggers also fire for rows removed by ON DELETE CASCADE
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_media_ref_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT OR IGNORE INTO media_files (path) VALUES (new.{column});
+            UPDATE media_files SET ref_count = ref_count + 1 WHERE path = new.{column};
+        END
+        """)
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_media_ref_delete AFTER DELETE ON {table}
+        BEGIN
+            UPDATE media_files SET ref_count = ref_count - 1 WHERE path = old.{column};
+        END
+        """)
+
+
+# The position in this list (starting at 1) is the schema version
+MIGRATIONS: List[Migration] = [
+    _create_base_schema,
+    _add_strokes,
+    _add_note_foreign_key_indexes_and_cascades,
+    _add_notes_full_text_search,
+    _add_note_listing_index,
+    _add_media_reference_counts,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS) -> int:
+    """
+    Bring the database up to the latest schema version, each migration runs
+    in its own transaction together with the version bump. Returns the
+    version the database was at before migrating.
+    """
+    start_version = get_schema_version(conn)
+    if start_version > len(migrations):
+        raise RuntimeError(
+            f"Database schema version {start_version} is newer than this application supports ({len(migrations)})."
+        )
+    if start_version == len(migrations):
+        return start_version
+
+    # Table rebuilds must not trigger cascades, and the pragma is a no-op
+    # inside a transaction, so it is switched off around the whole run.
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, migration in enumerate(migrations[start_version:], start=start_version + 1):
+            conn.execute("BEGIN")
+            try:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+    return start_version
@@ -1,13 +1,85 @@
 import sqlite3
 import os
-from typing import List, Optional
-from src.core.interfaces import INoteRepository, Note, NoteImage, NoteAudio, SketchPoint
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from src.core.interfaces import INoteRepository, Note, NoteSummary, NoteSummaryPage, NoteCursor, NoteSearchResult, NoteImage, NoteAudio, SketchPoint, SketchStroke
 from src.data.database_manager import SQLiteDatabaseManager
+from src.core.sketch_arrays import SketchArrays
+from src.data.stroke_codec import encode_points, decode_points, decode_sketch_rows, split_points_into_strokes, stroke_to_points
+
+PREVIEW_LENGTH = 80  # Characters of text_content shown on a note card
+
+SNIPPET_HIGHLIGHT_START = "["
+SNIPPET_HIGHLIGHT_END = "]"
+SNIPPET_TOKENS = 12  # Approximate number of words around a match in a snippet
+
+# Summary of one note with per-note counts, takes PREVIEW_LENGTH twice as parameters
+SUMMARY_COLUMNS = """
+    notes.id, notes.note_name,
+    substr(COALESCE(notes.text_content, ''), 1, ?),
+    length(COALESCE(notes.text_content, '')) > ?,
+    notes.is_secure,
+    (SELECT COUNT(*) FROM images WHERE images.note_id = notes.id),
+    (SELECT COUNT(*) FROM audio WHERE audio.note_id = notes.id),
+    (SELECT COALESCE(SUM(point_count), 0) FROM strokes WHERE strokes.note_id = notes.id),
+    notes.updated_at
+"""
+
+INSERT_STROKE_SQL = """
+    INSERT INTO strokes
+    (note_id, size, red, green, blue, opacity, point_count, points)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def build_fts_query(text: str) -> str:
+    """
+    Turn free text typed by the user into an FTS5 MATCH expression. Every
+    word becomes a quoted prefix term, so FTS5 operators and punctuation in
+    the input cannot cause syntax errors, and all words must match.
+    """
+    terms = []
+    for word in text.split():
+        escaped = word.replace('"', '""')
+        terms.append(f'"{escaped}"*')
+    return " ".join(terms)
 
 
 class SQLiteNoteRepository(INoteRepository):
     def __init__(self):
         self.db_manager = SQLiteDatabaseManager()
+        # Connections are per thread, so is the unit-of-work nesting depth
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Group several repository calls into one atomic unit. Methods called
+        inside the block skip their own commit, the outermost block commits
+        once on success and rolls everything back on error. Blocks may nest.
+        """
+        conn = self.db_manager.get_connection()
+        depth = getattr(self._local, "transaction_depth", 0)
+        if depth == 0 and not conn.in_transaction:
+            # Take the write lock up front so the unit never fails halfway on
+            # a read-to-write lock upgrade.
+            conn.execute("BEGIN IMMEDIATE")
+        self._local.transaction_depth = depth + 1
+        try:
+            yield
+        except BaseException:
+            self._local.transaction_depth = depth
+            if depth == 0:
+                conn.rollback()
+            raise
+        self._local.transaction_depth = depth
+        if depth == 0:
+            conn.commit()
+
+    def _commit(self, conn: sqlite3.Connection):
+        if getattr(self._local, "transaction_depth", 0) == 0:
+            conn.commit()
 
     def get_notes_by_user(self, user_id: int) -> List[Note]:
         conn = self.db_manager.get_connection()
@@ -17,14 +89,17 @@ class SQLiteNoteRepository(INoteRepository):
             FROM notes
             WHERE user_id = ?
         """, (user_id,))
+        rows = cursor.fetchall()
+
+        # Related data is fetched with one grouped query per child table
+        # instead of three queries per note, then attached in memory.
+        images_by_note = self._get_images_for_user(user_id)
+        audio_by_note = self._get_audio_for_user(user_id)
+        strokes_by_note = self._get_strokes_for_user(user_id)
 
         notes = []
-        for row in cursor.fetchall():
+        for row in rows:
             note_id, note_name, text_content, is_secure, secure_password = row
-            # Fetch related data when constructing the Note object
-            images = self.get_note_images(note_id)
-            audios = self.get_note_audio(note_id)
-            sketches = self.get_note_sketch_points(note_id)
             note = Note(
                 id=note_id,
                 user_id=user_id,
@@ -32,13 +107,200 @@ class SQLiteNoteRepository(INoteRepository):
                 text_content=text_content if text_content is not None else "",
                 is_secure=bool(is_secure),
                 secure_password=secure_password,
-                image_paths=images,
-                audio_paths=audios,
-                sketch_points=sketches
+                image_paths=images_by_note.get(note_id, []),
+                audio_paths=audio_by_note.get(note_id, []),
+                sketch_strokes=strokes_by_note.get(note_id, [])
             )
             notes.append(note)
         return notes
 
+    def get_note_summaries_by_user(self, user_id: int) -> List[NoteSummary]:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        # Only the first PREVIEW_LENGTH characters of the content leave the database,
+        # media and sketches are reduced to per-note counts.
+        cursor.execute("""
+            SELECT notes.id, notes.note_name,
+                   substr(COALESCE(notes.text_content, ''), 1, ?),
+                   length(COALESCE(notes.text_content, '')) > ?,
+                   notes.is_secure,
+                   COALESCE(image_counts.total, 0),
+                   COALESCE(audio_counts.total, 0),
+                   COALESCE(sketch_counts.total, 0),
+                   notes.updated_at
+            FROM notes
+            LEFT JOIN (
+                SELECT note_id, COUNT(*) AS total FROM images
+                WHERE note_id IN (SELECT id FROM notes WHERE user_id = ?)
+                GROUP BY note_id
+            ) AS image_counts ON image_counts.note_id = notes.id
+            LEFT JOIN (
+                SELECT note_id, COUNT(*) AS total FROM audio
+                WHERE note_id IN (SELECT id FROM notes WHERE user_id = ?)
+                GROUP BY note_id
+            ) AS audio_counts ON audio_counts.note_id = notes.id
+            LEFT JOIN (
+                SELECT note_id, SUM(point_count) AS total FROM strokes
+                WHERE note_id IN (SELECT id FROM notes WHERE user_id = ?)
+                GROUP BY note_id
+            ) AS sketch_counts ON sketch_counts.note_id = notes.id
+            WHERE notes.user_id = ?
+            ORDER BY notes.updated_at DESC, notes.id DESC
+        """, (PREVIEW_LENGTH, PREVIEW_LENGTH, user_id, user_id, user_id, user_id))
+        return [self._row_to_summary(user_id, row) for row in cursor.fetchall()]
+
+    def list_note_summaries(self, user_id: int, limit: int, after: Optional[NoteCursor] = None) -> NoteSummaryPage:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        # Keyset pagination over idx_notes_user_updated: the page starts right
+        # after the cursor, so its cost does not depend on how deep it is.
+        # Counts use per-note subqueries on the note_id indexes, only for this page.
+        keyset_filter = "AND (notes.updated_at, notes.id) < (?, ?)" if after is not None else ""
+        params = [PREVIEW_LENGTH, PREVIEW_LENGTH, user_id]
+        if after is not None:
+            params += [after.updated_at, after.id]
+        params.append(limit + 1) # One extra row tells whether another page exists
+        cursor.execute(f"""
+            SELECT {SUMMARY_COLUMNS}
+            FROM notes
+            WHERE notes.user_id = ? {keyset_filter}
+            ORDER BY notes.updated_at DESC, notes.id DESC
+            LIMIT ?
+        """, params)
+        rows = cursor.fetchall()
+
+        summaries = [self._row_to_summary(user_id, row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = summaries[-1]
+            next_cursor = NoteCursor(last.updated_at, last.id)
+        return NoteSummaryPage(summaries, next_cursor)
+
+    def get_note_summaries_by_ids(self, user_id: int, note_ids: List[int]) -> List[NoteSummary]:
+        if not note_ids:
+            return []
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" * len(note_ids))
+        cursor.execute(f"""
+            SELECT {SUMMARY_COLUMNS}
+            FROM notes
+            WHERE notes.user_id = ? AND notes.id IN ({placeholders})
+            ORDER BY notes.updated_at DESC, notes.id DESC
+        """, [PREVIEW_LENGTH, PREVIEW_LENGTH, user_id, *note_ids])
+        return [self._row_to_summary(user_id, row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _row_to_summary(user_id: int, row) -> NoteSummary:
+        note_id, note_name, preview, truncated, is_secure, image_count, audio_count, sketch_count, updated_at = row
+        return NoteSummary(
+            id=note_id,
+            user_id=user_id,
+            note_name=note_name,
+            preview=preview + "..." if truncated else preview,
+            is_secure=bool(is_secure),
+            image_count=image_count,
+            audio_count=audio_count,
+            sketch_point_count=sketch_count,
+            updated_at=updated_at
+        )
+
+    def get_note_by_id(self, note_id: int, user_id: int) -> Optional[Note]:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT note_name, text_content, is_secure, secure_password
+            FROM notes
+            WHERE id = ? AND user_id = ?
+        """, (note_id, user_id))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        note_name, text_content, is_secure, secure_password = row
+        return Note(
+            id=note_id,
+            user_id=user_id,
+            note_name=note_name,
+            text_content=text_content if text_content is not None else "",
+            is_secure=bool(is_secure),
+            secure_password=secure_password,
+            image_paths=self.get_note_images(note_id),
+            audio_paths=self.get_note_audio(note_id),
+            sketch_strokes=self.get_note_strokes(note_id)
+        )
+
+    def search_notes(self, user_id: int, query: str, limit: int = 20, offset: int = 0) -> List[NoteSearchResult]:
+        match_expression = build_fts_query(query)
+        if not match_expression:
+            return []
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        # bm25 weights a hit in the note name ten times higher than one in the content
+        cursor.execute("""
+            SELECT notes.id, notes.note_name,
+                   snippet(notes_fts, -1, ?, ?, '...', ?),
+                   bm25(notes_fts, 10.0, 1.0) AS score
+            FROM notes_fts
+            JOIN notes ON notes.id = notes_fts.rowid
+            WHERE notes_fts MATCH ? AND notes.user_id = ?
+            ORDER BY score
+            LIMIT ? OFFSET ?
+        """, (SNIPPET_HIGHLIGHT_START, SNIPPET_HIGHLIGHT_END, SNIPPET_TOKENS,
+              match_expression, user_id, limit, offset))
+        return [NoteSearchResult(*row) for row in cursor.fetchall()]
+
+    def _get_images_for_user(self, user_id: int) -> Dict[int, List[NoteImage]]:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT images.note_id, images.image_path
+            FROM images
+            JOIN notes ON notes.id = images.note_id
+            WHERE notes.user_id = ?
+            ORDER BY images.note_id, images.id
+        """, (user_id,))
+        images_by_note: Dict[int, List[NoteImage]] = {}
+        for note_id, image_path in cursor.fetchall():
+            images_by_note.setdefault(note_id, []).append(NoteImage(image_path))
+        return images_by_note
+
+    def _get_audio_for_user(self, user_id: int) -> Dict[int, List[NoteAudio]]:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT audio.note_id, audio.audio_path
+            FROM audio
+            JOIN notes ON notes.id = audio.note_id
+            WHERE notes.user_id = ?
+            ORDER BY audio.note_id, audio.id
+        """, (user_id,))
+        audio_by_note: Dict[int, List[NoteAudio]] = {}
+        for note_id, audio_path in cursor.fetchall():
+            audio_by_note.setdefault(note_id, []).append(NoteAudio(audio_path))
+        return audio_by_note
+
+    def _get_strokes_for_user(self, user_id: int) -> Dict[int, List[SketchStroke]]:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        # Strokes must stay in insertion order, the canvas replays them in sequence
+        cursor.execute("""
+            SELECT strokes.note_id, strokes.id, size, red, green, blue, opacity, points
+            FROM strokes
+            JOIN notes ON notes.id = strokes.note_id
+            WHERE notes.user_id = ?
+            ORDER BY strokes.note_id, strokes.id
+        """, (user_id,))
+        strokes_by_note: Dict[int, List[SketchStroke]] = {}
+        for row in cursor.fetchall():
+            strokes_by_note.setdefault(row[0], []).append(self._row_to_stroke(row[1:]))
+        return strokes_by_note
+
+    @staticmethod
+    def _row_to_stroke(row) -> SketchStroke:
+        stroke_id, size, red, green, blue, opacity, points = row
+        return SketchStroke(size, red, green, blue, opacity, decode_points(points), stroke_id)
+
     def create_note(self, user_id: int, note_name: str, text_content: str, is_secure: bool, secure_password: Optional[str]) -> Note:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
@@ -46,7 +308,7 @@ class SQLiteNoteRepository(INoteRepository):
             INSERT INTO notes (user_id, note_name, text_content, is_secure, secure_password)
             VALUES (?, ?, ?, ?, ?)
         """, (user_id, note_name, text_content, int(is_secure), secure_password))
-        conn.commit()
+        self._commit(conn)
         note_id = cursor.lastrowid
         if note_id is None:
             raise Exception("Failed to create note, no ID returned.")
@@ -62,18 +324,14 @@ class SQLiteNoteRepository(INoteRepository):
             SET text_content = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         """, (text_content, note_id))
-        conn.commit()
+        self._commit(conn)
 
     def delete_note(self, note_id: int):
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
-        # It's good practice to delete related records first to maintain integrity,
-        # though cascading deletes could also be set up in the DB schema.
-        cursor.execute("DELETE FROM sketch_points WHERE note_id = ?", (note_id,))
-        cursor.execute("DELETE FROM images WHERE note_id = ?", (note_id,))
-        cursor.execute("DELETE FROM audio WHERE note_id = ?", (note_id,))
+        # Images, audio and sketch rows go with it through ON DELETE CASCADE
         cursor.execute("DELETE FROM notes WHERE id = ?", (note_id,))
-        conn.commit()
+        self._commit(conn)
 
     def note_name_exists(self, user_id: int, note_name: str) -> bool:
         conn = self.db_manager.get_connection()
@@ -92,7 +350,7 @@ class SQLiteNoteRepository(INoteRepository):
             "INSERT INTO images (note_id, image_path) VALUES (?, ?)",
             (note_id, image_path)
         )
-        conn.commit()
+        self._commit(conn)
 
     def remove_image_from_note(self, note_id: int, image_path: str):
         conn = self.db_manager.get_connection()
@@ -101,12 +359,12 @@ class SQLiteNoteRepository(INoteRepository):
             "DELETE FROM images WHERE note_id = ? AND image_path = ?",
             (note_id, image_path)
         )
-        conn.commit()
+        self._commit(conn)
 
     def get_note_images(self, note_id: int) -> List[NoteImage]:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT image_path FROM images WHERE note_id = ?", (note_id,))
+        cursor.execute("SELECT image_path FROM images WHERE note_id = ? ORDER BY id", (note_id,))
         return [NoteImage(row[0]) for row in cursor.fetchall()]
 
     def add_audio_to_note(self, note_id: int, audio_path: str):
@@ -116,7 +374,7 @@ class SQLiteNoteRepository(INoteRepository):
             "INSERT INTO audio (note_id, audio_path) VALUES (?, ?)",
             (note_id, audio_path)
         )
-        conn.commit()
+        self._commit(conn)
 
     # Implementation for the newly added interface method
     def remove_audio_from_note(self, note_id: int, audio_path: str):
@@ -126,40 +384,105 @@ class SQLiteNoteRepository(INoteRepository):
             "DELETE FROM audio WHERE note_id = ? AND audio_path = ?",
             (note_id, audio_path)
         )
-        conn.commit()
+        self._commit(conn)
 
     def get_note_audio(self, note_id: int) -> List[NoteAudio]:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT audio_path FROM audio WHERE note_id = ?", (note_id,))
+        cursor.execute("SELECT audio_path FROM audio WHERE note_id = ? ORDER BY id", (note_id,))
         return [NoteAudio(row[0]) for row in cursor.fetchall()]
 
-    def add_sketch_point_to_note(self, note_id: int, point: SketchPoint):
+    def register_media(self, path: str, sha256: str, size: int):
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
+        # Reference counts come from the image and audio triggers, this only
+        # records what the file is. Re-registering a known path is a no-op.
         cursor.execute("""
-            INSERT INTO sketch_points
-            (note_id, x, y, size, red, green, blue, opacity)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            note_id, point.x, point.y, point.size,
-            point.red, point.green, point.blue, point.opacity
-        ))
-        conn.commit()
+            INSERT INTO media_files (path, sha256, size) VALUES (?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET
+                sha256 = COALESCE(media_files.sha256, excluded.sha256),
+                size = COALESCE(media_files.size, excluded.size)
+        """, (path, sha256, size))
+        self._commit(conn)
+
+    def get_media_ref_count(self, path: str) -> int:
+        conn = self.db_manager.get_connection()
+        row = conn.execute("SELECT ref_count FROM media_files WHERE path = ?", (path,)).fetchone()
+        return row[0] if row else 0
+
+    def delete_media_if_unreferenced(self, path: str) -> bool:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM media_files WHERE path = ? AND ref_count <= 0", (path,))
+        self._commit(conn)
+        return cursor.rowcount > 0
+
+    def get_referenced_media_paths(self) -> List[str]:
+        conn = self.db_manager.get_connection()
+        return [row[0] for row in conn.execute("SELECT path FROM media_files WHERE ref_count > 0")]
+
+    def get_unreferenced_media_paths(self) -> List[str]:
+        conn = self.db_manager.get_connection()
+        return [row[0] for row in conn.execute("SELECT path FROM media_files WHERE ref_count <= 0")]
+
+    def add_sketch_point_to_note(self, note_id: int, point: SketchPoint):
+        self.add_sketch_points_to_note(note_id, [point])
+
+    def add_sketch_points_to_note(self, note_id: int, points: List[SketchPoint]):
+        if not points:
+            return
+        conn = self.db_manager.get_connection()
+        # Points are stored as packed strokes, a whole batch is one transaction
+        self._insert_strokes(conn.cursor(), note_id, split_points_into_strokes(points))
+        self._commit(conn)
+
+    def add_stroke_to_note(self, note_id: int, stroke: SketchStroke) -> SketchStroke:
+        conn = self.db_manager.get_connection()
+        cursor = conn.cursor()
+        self._insert_strokes(cursor, note_id, [stroke])
+        self._commit(conn)
+        stroke.id = cursor.lastrowid
+        return stroke
+
+    def _insert_strokes(self, cursor, note_id: int, strokes: List[SketchStroke]):
+        rows = [
+            (note_id, stroke.size, stroke.red, stroke.green, stroke.blue, stroke.opacity,
+             len(stroke.points), encode_points(stroke.points))
+            for stroke in strokes
+        ]
+        if len(rows) == 1:
+            # execute() keeps cursor.lastrowid, executemany() does not
+            cursor.execute(INSERT_STROKE_SQL, rows[0])
+        else:
+            cursor.executemany(INSERT_STROKE_SQL, rows)
 
     def clear_sketch_points_for_note(self, note_id: int):
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
+        cursor.execute("DELETE FROM strokes WHERE note_id = ?", (note_id,))
         cursor.execute("DELETE FROM sketch_points WHERE note_id = ?", (note_id,))
-        conn.commit()
+        self._commit(conn)
 
-    def get_note_sketch_points(self, note_id: int) -> List[SketchPoint]:
+    def get_note_strokes(self, note_id: int) -> List[SketchStroke]:
         conn = self.db_manager.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT x, y, size, red, green, blue, opacity
-            FROM sketch_points
+            SELECT id, size, red, green, blue, opacity, points
+            FROM strokes
             WHERE note_id = ?
+            ORDER BY id
         """, (note_id,))
-        # Ensure correct number of arguments for SketchPoint constructor
-        return [SketchPoint(row[0], row[1], row[2], row[3], row[4], row[5], row[6]) for row in cursor.fetchall()]
\ No newline at end of file
+        return [self._row_to_stroke(row) for row in cursor.fetchall()]
+
+    def get_note_sketch_arrays(self, note_id: int) -> SketchArrays:
+        conn = self.db_manager.get_connection()
+        rows = conn.execute("""
+            SELECT id, size, red, green, blue, opacity, point_count, points
+            FROM strokes
+            WHERE note_id = ?
+            ORDER BY id
+        """, (note_id,)).fetchall()
+        return decode_sketch_rows(rows)
+
+    def get_note_sketch_points(self, note_id: int) -> List[SketchPoint]:
+        return [point for stroke in self.get_note_strokes(note_id) for point in stroke_to_points(stroke)]
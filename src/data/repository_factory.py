@@ -0,0 +1,63 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+from src.core.interfaces import INoteRepository, IUserRepository
+from src.data.database_manager import SQLiteDatabaseManager, DatabaseConfig
+
+BACKEND_SQLITE = "sqlite"
+BACKEND_MEMORY = "memory"
+BACKENDS = (BACKEND_SQLITE, BACKEND_MEMORY)
+
+BACKEND_ENV_VAR = "NOTEMASTER_BACKEND"
+
+
+@dataclass
+class Repositories:
+    backend: str
+    user_repository: IUserRepository
+    note_repository: INoteRepository
+
+    def close(self):
+        if self.backend == BACKEND_SQLITE:
+            SQLiteDatabaseManager().close()
+
+
+def default_backend() -> str:
+    return os.environ.get(BACKEND_ENV_VAR, BACKEND_SQLITE)
+
+
+def create_repositories(backend: str = BACKEND_SQLITE, db_config: Optional[DatabaseConfig] = None) -> Repositories:
+    """
+    Build a user and a note repository that share one storage backend.
+    "sqlite" uses the database singleton (configured by db_config on first
+    use), "memory" keeps everything in a fresh in-memory store that lives as
+    long as the returned repositories.
+    """
+    if backend == BACKEND_SQLITE:
+        from src.data.note_repository import SQLiteNoteRepository
+        from src.data.user_repository import SQLiteUserRepository
+        SQLiteDatabaseManager(db_config)
+        return Repositories(backend, SQLiteUserRepository(), SQLiteNoteRepository())
+    if backend == BACKEND_MEMORY:
+        from src.data.memory_repository import InMemoryStore, InMemoryUserRepository, InMemoryNoteRepository
+        store = InMemoryStore()
+        return Repositories(backend, InMemoryUserRepository(store), InMemoryNoteRepository(store))
+    raise ValueError(f"Unknown repository backend \'{backend}\', expected one of: {', '.join(BACKENDS)}")
+
+
+_active_repositories: Optional[Repositories] = None
+
+
+def configure_repositories(backend: str, db_config: Optional[DatabaseConfig] = None) -> Repositories:
+    """Select the backend the application uses, called once at startup"""
+    global _active_repositories
+    _active_repositories = create_repositories(backend, db_config)
+    return _active_repositories
+
+
+def get_repositories() -> Repositories:
+    # Windows created later (login, sign out) must reach the same store, an
+    # in-memory backend would otherwise start empty each time.
+    if _active_repositories is None:
+        return configure_repositories(default_backend())
+    return _active_repositories
@@ -0,0 +1,103 @@
+import struct
+import sys
+from array import array
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.core.interfaces import SketchPoint, SketchStroke
+from src.core.sketch_arrays import SketchArrays
+
+# Stroke coordinates are stored as one little-endian BLOB per stroke:
+# a 5 byte header (format tag, point count) followed by interleaved x, y values.
+# Canvas input is integer pixels, so int16 is used whenever it is lossless
+# and float32 otherwise.
+FORMAT_INT16 = 1
+FORMAT_FLOAT32 = 2
+
+_HEADER = struct.Struct("<BI")
+_TYPECODES = {FORMAT_INT16: "h", FORMAT_FLOAT32: "f"}
+_NUMPY_DTYPES = {FORMAT_INT16: np.dtype("<i2"), FORMAT_FLOAT32: np.dtype("<f4")}
+_INT16_MIN, _INT16_MAX = -32768, 32767
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+def encode_points(points: Sequence[Tuple[float, float]]) -> bytes:
+    """Pack (x, y) pairs into a stroke BLOB"""
+    flat = [coordinate for point in points for coordinate in point]
+    if all(float(c).is_integer() and _INT16_MIN <= c <= _INT16_MAX for c in flat):
+        point_format = FORMAT_INT16
+        values = array("h", [int(c) for c in flat])
+    else:
+        point_format = FORMAT_FLOAT32
+        values = array("f", flat)
+    if _SWAP_BYTES:
+        values.byteswap()
+    return _HEADER.pack(point_format, len(points)) + values.tobytes()
+
+
+def decode_points(blob: bytes) -> List[Tuple[float, float]]:
+    """Unpack a stroke BLOB back into (x, y) pairs"""
+    point_format, count = _HEADER.unpack_from(blob)
+    if point_format not in _TYPECODES:
+        raise ValueError(f"Unknown stroke point format {point_format}")
+    values = array(_TYPECODES[point_format])
+    values.frombytes(blob[_HEADER.size:])
+    if len(values) != count * 2:
+        raise ValueError(f"Corrupt stroke buffer: expected {count} points, found {len(values) / 2:g}")
+    if _SWAP_BYTES:
+        values.byteswap()
+    coordinates = iter(values)
+    return [(float(x), float(y)) for x, y in zip(coordinates, coordinates)]
+
+
+# id, size, red, green, blue, opacity, point_count, points
+StrokeRow = Tuple[Optional[int], float, float, float, float, float, int, bytes]
+
+
+def decode_sketch_rows(rows: Sequence[StrokeRow]) -> SketchArrays:
+    """
+    Columnar sketch straight from strokes table rows. Each BLOB is viewed as
+    an array and copied into the x and y columns, no per-point objects are
+    ever created.
+    """
+    sketch = SketchArrays.allocate(len(rows), sum(row[6] for row in rows))
+    start = 0
+    for index, (stroke_id, size, red, green, blue, opacity, count, blob) in enumerate(rows):
+        point_format, stored_count = _HEADER.unpack_from(blob)
+        if point_format not in _NUMPY_DTYPES:
+            raise ValueError(f"Unknown stroke point format {point_format}")
+        if stored_count != count or len(blob) != _HEADER.size + count * 2 * _NUMPY_DTYPES[point_format].itemsize:
+            raise ValueError(f"Corrupt stroke buffer: expected {count} points")
+        values = np.frombuffer(blob, dtype=_NUMPY_DTYPES[point_format], count=count * 2, offset=_HEADER.size)
+        end = start + count
+        sketch.x[start:end] = values[0::2]
+        sketch.y[start:end] = values[1::2]
+        sketch.offsets[index + 1] = end
+        sketch.size[index] = size
+        sketch.color[index] = (red, green, blue, opacity)
+        sketch.stroke_ids[index] = stroke_id
+        start = end
+    return sketch
+
+
+def split_points_into_strokes(points: Sequence[SketchPoint]) -> List[SketchStroke]:
+    """
+    Group legacy per-point rows into strokes. Rows carry no stroke id, so
+    consecutive points with identical brush settings are treated as one
+    stroke, the same rule the canvas used to redraw them.
+    """
+    strokes: List[SketchStroke] = []
+    current = None
+    for point in points:
+        brush = (point.size, point.red, point.green, point.blue, point.opacity)
+        if current is None or brush != (current.size, current.red, current.green, current.blue, current.opacity):
+            current = SketchStroke(*brush)
+            strokes.append(current)
+        current.points.append((point.x, point.y))
+    return strokes
+
+
+def stroke_to_points(stroke: SketchStroke) -> List[SketchPoint]:
+    return [
+        SketchPoint(x, y, stroke.size, stroke.red, stroke.green, stroke.blue, stroke.opacity)
+        for x, y in stroke.points
+    ]
@@ -0,0 +1,142 @@
+from typing import Any, Callable, List, Optional, Set
+from PyQt5 import sip
+from PyQt5.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, pyqtSignal
+from src.core.interfaces import NoteCursor, SketchStroke, User
+from src.services.note_service import NoteService, NoteChange
+from src.services.user_folder_manager import UserFolderManager
+
+
+class _TaskSignals(QObject):
+    # Created on the UI thread, so results emitted from a worker are queued
+    # back to the UI thread before any callback runs.
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class _ServiceTask(QRunnable):
+    def __init__(self, func: Callable, args: tuple, kwargs: dict, signals: _TaskSignals):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
+
+
+class AsyncNoteService(QObject):
+    """
+    Runs NoteService calls on a worker thread and delivers the outcome to
+    callbacks on the Qt main thread, so database I/O never blocks the event
+    loop. NoteService change notifications are re-emitted as note_changed,
+    always on the main thread.
+
+    With the default single worker, calls run strictly in submission order:
+    a load queued after a save always sees the saved data.
+    """
+
+    note_changed = pyqtSignal(object)  # NoteChange
+
+    def __init__(self, note_service: NoteService, max_threads: int = 1, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.note_service = note_service
+        # Emitting from a worker queues delivery to receivers on the main thread
+        forward_change = self._forward_change
+        note_service.add_listener(forward_change)
+        self.destroyed.connect(lambda: note_service.remove_listener(forward_change))
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_threads)
+        # Workers never expire: each new thread would open its own database
+        # connection, and the expired thread's one is not closed until exit
+        self.thread_pool.setExpiryTimeout(-1)
+        self._pending: Set[_TaskSignals] = set()  # Keeps signal objects alive until delivery
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            # Let queued writes finish before main.py closes the database
+            app.aboutToQuit.connect(self.wait_for_done)
+
+    def submit(self, func: Callable, *args,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               context: Optional[QObject] = None, **kwargs):
+        """
+        Run func(*args, **kwargs) in the background. If a context widget is
+        given and has been deleted by the time the call finishes, the
+        callbacks are skipped.
+        """
+        signals = _TaskSignals()
+        self._pending.add(signals)
+
+        def context_alive() -> bool:
+            return context is None or not sip.isdeleted(context)
+
+        def deliver_result(result):
+            self._pending.discard(signals)
+            if on_result and context_alive():
+                on_result(result)
+
+        def deliver_error(error):
+            self._pending.discard(signals)
+            if on_error and context_alive():
+                on_error(error)
+            else:
+                print(f"Background note operation {getattr(func, '__name__', func)} failed: {error}")
+
+        signals.finished.connect(deliver_result)
+        signals.failed.connect(deliver_error)
+        self.thread_pool.start(_ServiceTask(func, args, kwargs, signals))
+
+    def _forward_change(self, change: NoteChange):
+        try:
+            self.note_changed.emit(change)
+        except RuntimeError:
+            pass  # Deleted on the main thread while the change was being made
+
+    def wait_for_done(self, timeout_ms: int = -1) -> bool:
+        return self.thread_pool.waitForDone(timeout_ms)
+
+    # Wrappers for the calls the UI makes most, all take the same callback
+    # keyword arguments as submit().
+
+    def get_note_summaries_for_user(self, user_id: int, **callbacks):
+        self.submit(self.note_service.get_note_summaries_for_user, user_id, **callbacks)
+
+    def get_note_summaries_by_ids(self, user_id: int, note_ids: List[int], **callbacks):
+        self.submit(self.note_service.get_note_summaries_by_ids, user_id, note_ids, **callbacks)
+
+    def list_note_summaries(self, user_id: int, limit: int, after: Optional[NoteCursor] = None, **callbacks):
+        self.submit(self.note_service.list_note_summaries, user_id, limit, after, **callbacks)
+
+    def get_note_by_id(self, note_id: int, user_id: int, **callbacks):
+        self.submit(self.note_service.get_note_by_id, note_id, user_id, **callbacks)
+
+    def update_note_content(self, note_id: int, text_content: str, **callbacks):
+        self.submit(self.note_service.update_note_content, note_id, text_content, **callbacks)
+
+    def add_stroke_to_note(self, note_id: int, stroke: SketchStroke, **callbacks):
+        self.submit(self.note_service.add_stroke_to_note, note_id, stroke, **callbacks)
+
+    def clear_sketch_points_for_note(self, note_id: int, **callbacks):
+        self.submit(self.note_service.clear_sketch_points_for_note, note_id, **callbacks)
+
+    def import_image(self, note_id: int, source_path: str, user_folder_manager: UserFolderManager, **callbacks):
+        self.submit(self.note_service.import_image, note_id, source_path, user_folder_manager, **callbacks)
+
+    def import_audio(self, note_id: int, source_path: str, user_folder_manager: UserFolderManager, **callbacks):
+        self.submit(self.note_service.import_audio, note_id, source_path, user_folder_manager, **callbacks)
+
+    def remove_image_from_note(self, note_id: int, image_path: str, **callbacks):
+        self.submit(self.note_service.remove_image_from_note, note_id, image_path, **callbacks)
+
+    def remove_audio_from_note(self, note_id: int, audio_path: str, **callbacks):
+        self.submit(self.note_service.remove_audio_from_note, note_id, audio_path, **callbacks)
+
+    def delete_note(self, note_id: int, user: User, **callbacks):
+        self.submit(self.note_service.delete_note, note_id, user, **callbacks)
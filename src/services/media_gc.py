@@ -0,0 +1,247 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+from src.core.interfaces import INoteRepository
+from src.services.media_store import MediaStore
+from src.services.user_folder_manager import USERS_FOLDER, MEDIA_FOLDERS
+
+DEFAULT_BATCH_SIZE = 200  # Files removed per lock acquisition and transaction
+DEFAULT_MIN_AGE_SECONDS = 10 * 60  # Unreferenced files younger than this may still be mid-import
+
+_FULL_PASS = object()
+_STOP = object()
+
+_collectors: "weakref.WeakSet[MediaGarbageCollector]" = weakref.WeakSet()  # Every collector that started a worker
+_collectors_lock = threading.Lock()
+
+
+@dataclass
+class MediaGCReport:
+    scanned_files: int = 0
+    orphaned_files: int = 0
+    removed_files: int = 0
+    reclaimed_bytes: int = 0
+    errors: List[str] = field(default_factory=list)
+    duration_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (f"Media GC: removed {self.removed_files} of {self.orphaned_files} orphaned files "
+                f"({self.reclaimed_bytes / (1024 * 1024):.1f} MiB) after scanning {self.scanned_files} "
+                f"in {self.duration_seconds:.2f}s, {len(self.errors)} errors")
+
+
+def _print_report(report: MediaGCReport):
+    if report.removed_files or report.errors:
+        print(report)
+
+
+def stop_all_collectors(timeout: Optional[float] = None):
+    """Stop every collector's worker, main.py calls this once before closing storage"""
+    with _collectors_lock:
+        collectors = list(_collectors)
+    for collector in collectors:
+        collector.stop(timeout)
+
+
+class MediaGarbageCollector:
+    """
+    Removes media files that no note references any more.
+
+    A full pass lists the referenced paths from the database, walks the
+    users' images/audio folders with os.scandir and deletes the difference.
+    Files released by note and attachment deletes are queued and removed
+    without a scan. All deletions happen on one background thread, in
+    batches that re-check the reference counts under the media store lock.
+
+    With a repository that does not own the media files (the in-memory
+    backend) nothing is scanned, and only files written since the collector
+    was created are ever removed: older ones may belong to the database.
+    """
+
+    def __init__(self, note_repository: INoteRepository, media_store: MediaStore,
+                 media_root: str = USERS_FOLDER, batch_size: int = DEFAULT_BATCH_SIZE,
+                 min_age_seconds: float = DEFAULT_MIN_AGE_SECONDS,
+                 on_report: Optional[Callable[[MediaGCReport], None]] = _print_report):
+        self.note_repository = note_repository
+        self.media_store = media_store
+        self.media_root = media_root
+        self.batch_size = batch_size
+        self.min_age_seconds = min_age_seconds
+        self.on_report = on_report
+        self.scan_filesystem = note_repository.owns_media_files
+        self._created_at = time.time()
+        self.last_report: Optional[MediaGCReport] = None
+        self._interval_seconds: Optional[float] = None
+        # Each worker has its own queue, so a stopping worker that is still
+        # mid-pass can never take work or the stop meant for its successor
+        self._worker: Optional[threading.Thread] = None
+        self._queue: Optional["queue.Queue"] = None
+        self._worker_lock = threading.Lock()
+
+    # Background operation
+
+    def start(self, interval_seconds: Optional[float] = None):
+        """Start the worker, with interval_seconds it also runs a full pass on that schedule"""
+        self._interval_seconds = interval_seconds
+        with self._worker_lock:
+            self._ensure_worker()
+
+    def request_collection(self):
+        """Queue a full pass on the background thread"""
+        self._submit(_FULL_PASS)
+
+    def release(self, paths: Iterable[str]):
+        """Queue files whose references were just dropped, removed if still unreferenced"""
+        paths = list(dict.fromkeys(paths))
+        if paths:
+            self._submit(paths)
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Finish queued work and stop the worker. With a short timeout the old
+        worker may still be finishing while later work starts a new one.
+        """
+        with self._worker_lock:
+            worker, work_queue = self._worker, self._queue
+            self._worker = self._queue = None
+            if worker is not None:
+                work_queue.put(_STOP)
+        if worker is not None:
+            worker.join(timeout)
+
+    def _submit(self, item):
+        # Under the lock, so the item cannot land behind a stop it raced with
+        with self._worker_lock:
+            self._ensure_worker()
+            self._queue.put(item)
+
+    def _ensure_worker(self):
+        # Called with _worker_lock held
+        if self._worker is None:
+            self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name="media-gc", daemon=True)
+            self._worker.start()
+            with _collectors_lock:
+                _collectors.add(self)
+
+    def _run(self, work_queue: "queue.Queue"):
+        next_pass = time.monotonic() + self._interval_seconds if self._interval_seconds else None
+        while True:
+            timeout = max(0.0, next_pass - time.monotonic()) if next_pass is not None else None
+            try:
+                item = work_queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _FULL_PASS
+            if item is _STOP:
+                return
+            try:
+                if item is _FULL_PASS:
+                    report = self.collect()
+                    if self._interval_seconds:
+                        next_pass = time.monotonic() + self._interval_seconds
+                else:
+                    report = self._remove_unreferenced([(path, False) for path in item], MediaGCReport())
+            except Exception as e:
+                print(f"Media GC failed: {e}")
+                continue
+            self.last_report = report
+            if self.on_report:
+                self.on_report(report)
+
+    # Collection
+
+    def collect(self) -> MediaGCReport:
+        """Run a full pass on the calling thread and return what it reclaimed"""
+        started = time.monotonic()
+        report = MediaGCReport()
+        # Read before scanning: a file imported meanwhile is either young or
+        # referenced again by the time its batch re-checks it.
+        referenced = {os.path.normpath(path) for path in self.note_repository.get_referenced_media_paths()}
+        # Rows whose last reference is gone, wherever their file lives
+        candidates = [(path, False) for path in self.note_repository.get_unreferenced_media_paths()]
+        seen = {os.path.normpath(path) for path, _ in candidates}
+
+        if not self.scan_filesystem:
+            self._remove_unreferenced(candidates, report)
+            report.duration_seconds = time.monotonic() - started
+            return report
+
+        cutoff = time.time() - self.min_age_seconds
+        for path, modified in self._scan():
+            report.scanned_files += 1
+            normalized = os.path.normpath(path)
+            if normalized in referenced or normalized in seen or modified > cutoff:
+                continue
+            candidates.append((path, True))
+
+        self._remove_unreferenced(candidates, report)
+        report.duration_seconds = time.monotonic() - started
+        return report
+
+    def _scan(self) -> Iterable[Tuple[str, float]]:
+        try:
+            user_entries = list(os.scandir(self.media_root))
+        except FileNotFoundError:
+            return
+        for user_entry in user_entries:
+            if not user_entry.is_dir(follow_symlinks=False):
+                continue
+            for media_folder in MEDIA_FOLDERS:
+                try:
+                    entries = os.scandir(os.path.join(user_entry.path, media_folder))
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+                with entries:
+                    for entry in entries:
+                        if entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False).st_mtime
+
+    def _remove_unreferenced(self, candidates: List[Tuple[str, bool]], report: MediaGCReport) -> MediaGCReport:
+        # candidates are (path, found_by_scan), released paths count as orphans
+        # only once the database agrees nothing uses them
+        for start in range(0, len(candidates), self.batch_size):
+            batch = candidates[start:start + self.batch_size]
+            with self.media_store.lock:
+                removable = []
+                with self.note_repository.transaction():
+                    for path, found_by_scan in batch:
+                        if self.note_repository.get_media_ref_count(path) > 0:
+                            continue
+                        if not self.scan_filesystem and not self._written_this_session(path):
+                            continue # Deduplicated against a file this repository does not own
+                        # False for files the database never knew about
+                        if self.note_repository.delete_media_if_unreferenced(path) or found_by_scan:
+                            removable.append(path)
+                for path in removable:
+                    report.orphaned_files += 1
+                    try:
+                        size = os.stat(path).st_size
+                        self.media_store.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    except OSError as e:
+                        report.errors.append(f"{path}: {e}")
+                        continue
+                    report.removed_files += 1
+                    report.reclaimed_bytes += size
+        return report
+
+    def _written_this_session(self, path: str) -> bool:
+        try:
+            return os.stat(path).st_mtime >= self._created_at
+        except FileNotFoundError:
+            return False
+
+
+if __name__ == "__main__":
+    # On-demand collection from the command line, run from the app folder
+    from src.data.repository_factory import create_repositories
+
+    repositories = create_repositories()
+    collector = MediaGarbageCollector(repositories.note_repository, MediaStore(), on_report=None)
+    print(collector.collect())
+    repositories.close()
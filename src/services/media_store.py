@@ -0,0 +1,104 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+
+HASH_CHUNK_SIZE = 1024 * 1024  # Files are hashed and copied in 1 MiB chunks
+TEMP_FILE_PREFIX = ".incoming-"  # Partial writes, never referenced by a note
+
+# One per process: a collector from a signed out session may still be
+# draining while the next session's store already stores and references
+_MEDIA_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class StoredMedia:
+    path: str
+    sha256: str
+    size: int
+
+
+def hash_file(path: str) -> StoredMedia:
+    """SHA-256 of a file, read in chunks so large recordings never sit in memory"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return StoredMedia(path, digest.hexdigest(), size)
+
+
+class MediaStore:
+    """
+    Content-addressed file storage for note media. A file is stored once per
+    folder as <sha256><extension>, so attaching the same content again reuses
+    the existing file and names can never collide. Files only appear under
+    their final name once completely written.
+
+    The store only handles files; which notes reference them is tracked in
+    the database (see INoteRepository.register_media). Hold lock while
+    storing a file and referencing it, or while checking that a file is
+    unreferenced and deleting it, so the two never interleave. The lock is
+    shared by every MediaStore in the process.
+    """
+
+    def __init__(self):
+        self.lock = _MEDIA_LOCK
+
+    def store(self, source_path: str, target_dir: str, move: bool = False) -> StoredMedia:
+        """
+        Put a copy of source_path into target_dir, or move it there when move
+        is set (used for recordings that were written to a temporary file).
+        """
+        content = hash_file(source_path)
+        extension = os.path.splitext(source_path)[1].lower()
+        os.makedirs(target_dir, exist_ok=True)
+        stored_path = os.path.join(target_dir, content.sha256 + extension)
+
+        if os.path.exists(stored_path):
+            if move:
+                os.remove(source_path)
+        elif move:
+            try:
+                os.replace(source_path, stored_path)
+            except OSError:
+                # Different file system, fall back to copy and delete
+                self._write_atomically(source_path, stored_path)
+                os.remove(source_path)
+        else:
+            self._write_atomically(source_path, stored_path)
+        return StoredMedia(stored_path, content.sha256, content.size)
+
+    @staticmethod
+    def temp_path(target_dir: str, extension: str) -> str:
+        """A fresh path in target_dir for content that is written before it can be stored"""
+        os.makedirs(target_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix=TEMP_FILE_PREFIX, suffix=extension, dir=target_dir)
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def _write_atomically(source_path: str, stored_path: str):
+        # Copy to a temporary name in the same folder, then rename: a crash
+        # leaves at most a stray temp file, never a truncated media file.
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_FILE_PREFIX, dir=os.path.dirname(stored_path))
+        try:
+            with os.fdopen(fd, "wb") as target, open(source_path, "rb") as source:
+                shutil.copyfileobj(source, target, HASH_CHUNK_SIZE)
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, stored_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,149 @@
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Hashable, Optional
+from src.core.interfaces import Note, NoteSummary
+
+# Rough per-item costs used to size cache entries, they only need to be
+# proportional to real memory use for the byte budget to work.
+_OBJECT_OVERHEAD = 64
+_POINT_BYTES = 72  # Tuple of two floats
+_SUMMARY_BYTES = 200
+
+
+def approximate_size(value: Any) -> int:
+    if isinstance(value, Note):
+        size = _OBJECT_OVERHEAD * 4 + sys.getsizeof(value.text_content or "") + len(value.note_name)
+        size += sum(_OBJECT_OVERHEAD + len(image.image_path) for image in value.image_paths)
+        size += sum(_OBJECT_OVERHEAD + len(audio.audio_path) for audio in value.audio_paths)
+        size += sum(_OBJECT_OVERHEAD + len(stroke.points) * _POINT_BYTES for stroke in value.sketch_strokes)
+        return size
+    if isinstance(value, NoteSummary):
+        return _SUMMARY_BYTES + len(value.note_name) + len(value.preview)
+    if isinstance(value, (list, tuple)):
+        return _OBJECT_OVERHEAD + sum(approximate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def copy_value(value: Any) -> Any:
+    """
+    A copy of a cached value that shares nothing mutable with it, so callers
+    editing what they got (NoteWindow edits its note) never change the cache
+    """
+    if isinstance(value, Note):
+        return replace(
+            value,
+            image_paths=[replace(image) for image in value.image_paths],
+            audio_paths=[replace(audio) for audio in value.audio_paths],
+            sketch_strokes=[replace(stroke, points=list(stroke.points)) for stroke in value.sketch_strokes]
+        )
+    if isinstance(value, NoteSummary):
+        return replace(value)
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(copy_value(item) for item in value)
+    return value
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class NoteCache:
+    """
+    Thread-safe LRU cache bounded by entry count and approximate byte size.
+
+    Readers take generation() before querying the database and pass it to
+    put(). Any invalidation in between bumps the generation and the stale
+    result is dropped instead of cached.
+
+    Values are copied on the way in and on the way out (see copy_value), the
+    stored objects are never handed to callers.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size)
+        self._size_bytes = 0
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            value = entry[0]
+        return copy_value(value)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Look up without touching LRU order or the hit/miss counters"""
+        with self._lock:
+            entry = self._entries.get(key)
+            value = entry[0] if entry is not None else None
+        return copy_value(value)
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        value = copy_value(value)
+        size = approximate_size(value)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if size > self.max_bytes:
+                return
+            self._remove(key)
+            self._entries[key] = (value, size)
+            self._size_bytes += size
+            while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._size_bytes)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry[1]
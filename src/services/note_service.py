@@ -1,91 +1,223 @@
-import os
 # from typing import List, Optional # List and Optional already imported via interfaces
-from src.core.interfaces import INoteRepository, Note, NoteImage, NoteAudio, SketchPoint, User # <--- IMPORT User HERE
+from src.core.interfaces import INoteRepository, Note, NoteSummary, NoteSummaryPage, NoteCursor, NoteSearchResult, NoteImage, NoteAudio, SketchPoint, SketchStroke, User # <--- IMPORT User HERE
 from src.services.user_folder_manager import UserFolderManager
+from src.services.note_cache import NoteCache, CacheStats
+from src.services.media_store import MediaStore
+from src.services.media_gc import MediaGarbageCollector
 from src.core.security_utils import PasswordUtils
-from typing import List, Optional # Ensure these are available if not fully covered by interfaces import
+from src.core.sketch_arrays import SketchArrays
+from typing import Callable, List, Optional # Ensure these are available if not fully covered by interfaces import
+from dataclasses import dataclass
+import threading
+
+NOTE_CREATED = "created"
+NOTE_UPDATED = "updated"
+NOTE_DELETED = "deleted"
+
+
+@dataclass(frozen=True)
+class NoteChange:
+    kind: str  # NOTE_CREATED, NOTE_UPDATED or NOTE_DELETED
+    note_id: int
+    user_id: Optional[int] = None  # None when the service did not have it at hand
 
 
 class NoteService:
-    def __init__(self, note_repository: INoteRepository):
+    def __init__(self, note_repository: INoteRepository, cache: Optional[NoteCache] = None,
+                 media_store: Optional[MediaStore] = None):
         self.note_repository = note_repository
+        # Full notes and per-user summary lists, kept fresh by the mutating methods below
+        self.cache = cache if cache is not None else NoteCache()
+        self.media_store = media_store if media_store is not None else MediaStore()
+        # Files are never deleted inline, dropped references are handed to the collector
+        self.media_gc = MediaGarbageCollector(note_repository, self.media_store)
+        self._listeners: List[Callable[[NoteChange], None]] = []
+        self._listeners_lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[NoteChange], None]):
+        """
+        Call listener with a NoteChange after every committed change. It runs
+        on whichever thread made the change, UI code has to marshal it.
+        """
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[NoteChange], None]):
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _publish(self, change: NoteChange):
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(change)
+            except Exception as e:
+                print(f"Note change listener failed: {e}")
+
+    def cache_stats(self) -> CacheStats:
+        return self.cache.stats()
 
     def get_notes_for_user(self, user_id: int) -> List[Note]:
         return self.note_repository.get_notes_by_user(user_id)
 
-    def _get_note_by_id(self, note_id: int, user_id: int) -> Optional[Note]:
-        notes = self.note_repository.get_notes_by_user(user_id)
-        for note in notes:
-            if note.id == note_id:
-                # These are already loaded by get_notes_by_user in the updated SQLiteNoteRepository
-                # if not note.image_paths: 
-                #     note.image_paths = self.note_repository.get_note_images(note_id)
-                # if not note.audio_paths:
-                #     note.audio_paths = self.note_repository.get_note_audio(note_id)
-                # if not note.sketch_points:
-                #      note.sketch_points = self.note_repository.get_note_sketch_points(note_id)
-                return note
-        return None
+    def get_note_summaries_for_user(self, user_id: int) -> List[NoteSummary]:
+        key = ("summaries", user_id)
+        summaries = self.cache.get(key)
+        if summaries is None:
+            generation = self.cache.generation()
+            summaries = self.note_repository.get_note_summaries_by_user(user_id)
+            self.cache.put(key, summaries, generation)
+        return summaries
+
+    def list_note_summaries(self, user_id: int, limit: int = 50, after: Optional[NoteCursor] = None) -> NoteSummaryPage:
+        if limit <= 0:
+            raise ValueError("limit must be positive.")
+        return self.note_repository.list_note_summaries(user_id, limit, after)
+
+    def get_note_summaries_by_ids(self, user_id: int, note_ids: List[int]) -> List[NoteSummary]:
+        """Fresh summaries of the given notes, newest first. Missing or foreign ids are left out."""
+        return self.note_repository.get_note_summaries_by_ids(user_id, note_ids)
+
+    def get_note_by_id(self, note_id: int, user_id: int) -> Optional[Note]:
+        key = ("note", note_id)
+        note = self.cache.get(key)
+        if note is not None and note.user_id == user_id:
+            return note
+        generation = self.cache.generation()
+        note = self.note_repository.get_note_by_id(note_id, user_id)
+        if note is not None:
+            self.cache.put(key, note, generation)
+        return note
+
+    def _invalidate_note(self, note_id: int, user_id: Optional[int] = None, kind: str = NOTE_UPDATED):
+        """Drop a changed note and the summary lists that show it, then tell the listeners"""
+        if user_id is None:
+            cached = self.cache.peek(("note", note_id))
+            user_id = cached.user_id if cached is not None else None
+        self.cache.invalidate(("note", note_id))
+        if user_id is not None:
+            self.cache.invalidate(("summaries", user_id))
+        else:
+            self.cache.invalidate_where(lambda key: key[0] == "summaries")
+        self._publish(NoteChange(kind, note_id, user_id))
 
+    def search_notes(self, user_id: int, query: str, limit: int = 20, offset: int = 0) -> List[NoteSearchResult]:
+        if limit <= 0 or offset < 0:
+            raise ValueError("limit must be positive and offset must not be negative.")
+        return self.note_repository.search_notes(user_id, query.strip(), limit, offset)
 
     def create_note(self, user_id: int, note_name: str, text_content: str = "") -> Note:
-        if self.note_repository.note_name_exists(user_id, note_name):
-            raise ValueError(f"Note name \'{note_name}\' already exists for this user.")
-        return self.note_repository.create_note(user_id, note_name, text_content, False, None)
+        with self.note_repository.transaction():
+            if self.note_repository.note_name_exists(user_id, note_name):
+                raise ValueError(f"Note name \'{note_name}\' already exists for this user.")
+            note = self.note_repository.create_note(user_id, note_name, text_content, False, None)
+        self.cache.invalidate(("summaries", user_id))
+        self._publish(NoteChange(NOTE_CREATED, note.id, user_id))
+        return note
 
     def create_secure_note(self, user_id: int, note_name: str, password: str, text_content: str = "") -> Note:
-        if self.note_repository.note_name_exists(user_id, note_name):
-            raise ValueError(f"Note name \'{note_name}\' already exists for this user.")
+        # Hash before opening the transaction, bcrypt is deliberately slow
         hashed_password = PasswordUtils.hash_password(password)
-        return self.note_repository.create_note(user_id, note_name, text_content, True, hashed_password)
+        with self.note_repository.transaction():
+            if self.note_repository.note_name_exists(user_id, note_name):
+                raise ValueError(f"Note name \'{note_name}\' already exists for this user.")
+            note = self.note_repository.create_note(user_id, note_name, text_content, True, hashed_password)
+        self.cache.invalidate(("summaries", user_id))
+        self._publish(NoteChange(NOTE_CREATED, note.id, user_id))
+        return note
 
     def update_note_content(self, note_id: int, text_content: str):
         self.note_repository.update_note_content(note_id, text_content)
+        self._invalidate_note(note_id)
 
     def delete_note(self, note_id: int, user: User): 
-        note_to_delete = self._get_note_by_id(note_id, user.id)
+        # Look up the media and delete the rows atomically, files are only
+        # removed once the database change has been committed.
+        with self.note_repository.transaction():
+            note_to_delete = self.get_note_by_id(note_id, user.id)
+            self.note_repository.delete_note(note_id)
+        self._invalidate_note(note_id, user.id, NOTE_DELETED)
 
         if note_to_delete:
-            user_folder_manager = UserFolderManager(user.username)
-            for img_obj in note_to_delete.image_paths:
-                try:
-                    if os.path.exists(img_obj.image_path):
-                        os.remove(img_obj.image_path)
-                        print(f"Deleted image file: {img_obj.image_path}")
-                except OSError as e:
-                    print(f"Error deleting image file {img_obj.image_path}: {e}")
-            
-            for audio_obj in note_to_delete.audio_paths:
-                try:
-                    if os.path.exists(audio_obj.audio_path):
-                        os.remove(audio_obj.audio_path)
-                        print(f"Deleted audio file: {audio_obj.audio_path}")
-                except OSError as e:
-                    print(f"Error deleting audio file {audio_obj.audio_path}: {e}")
+            paths = [image.image_path for image in note_to_delete.image_paths]
+            paths += [audio.audio_path for audio in note_to_delete.audio_paths]
+            self._release_media(paths)
         else:
             print(f"Note with ID {note_id} not found for user {user.username} to delete associated files.")
 
-        self.note_repository.delete_note(note_id)
-
+    def _release_media(self, paths: List[str]):
+        """Hand files that may have lost their last reference to the collector"""
+        self.media_gc.release(paths)
+
+    def _attach_media(self, note_id: int, source_path: str, target_dir: str, move: bool,
+                      get_attached, attach) -> str:
+        with self.media_store.lock:
+            media = self.media_store.store(source_path, target_dir, move=move)
+            with self.note_repository.transaction():
+                self.note_repository.register_media(media.path, media.sha256, media.size)
+                # The same content attached twice to one note is one attachment
+                if media.path not in get_attached(note_id):
+                    attach(note_id, media.path)
+        self._invalidate_note(note_id)
+        return media.path
+
+    def import_image(self, note_id: int, source_path: str, user_folder_manager: UserFolderManager) -> str:
+        """Store a copy of an image file and attach it, returns the stored path"""
+        return self._attach_media(
+            note_id, source_path, user_folder_manager.get_images_path(), False,
+            lambda note_id: [image.image_path for image in self.note_repository.get_note_images(note_id)],
+            self.note_repository.add_image_to_note
+        )
+
+    def import_audio(self, note_id: int, source_path: str, user_folder_manager: UserFolderManager, move: bool = True) -> str:
+        """Store an audio file (by default moving a finished recording) and attach it"""
+        return self._attach_media(
+            note_id, source_path, user_folder_manager.get_audio_path(), move,
+            lambda note_id: [audio.audio_path for audio in self.note_repository.get_note_audio(note_id)],
+            self.note_repository.add_audio_to_note
+        )
 
     def add_image_to_note(self, note_id: int, image_path: str):
         self.note_repository.add_image_to_note(note_id, image_path)
+        self._invalidate_note(note_id)
 
     def remove_image_from_note(self, note_id: int, image_path: str):
         self.note_repository.remove_image_from_note(note_id, image_path)
+        self._invalidate_note(note_id)
+        self._release_media([image_path])
 
     def add_audio_to_note(self, note_id: int, audio_path: str):
         self.note_repository.add_audio_to_note(note_id, audio_path)
+        self._invalidate_note(note_id)
 
     def remove_audio_from_note(self, note_id: int, audio_path: str):
         self.note_repository.remove_audio_from_note(note_id, audio_path)
+        self._invalidate_note(note_id)
+        self._release_media([audio_path])
 
 
     def add_sketch_point_to_note(self, note_id: int, point: SketchPoint):
         self.note_repository.add_sketch_point_to_note(note_id, point)
+        self._invalidate_note(note_id)
+
+    def add_sketch_points_to_note(self, note_id: int, points: List[SketchPoint]):
+        self.note_repository.add_sketch_points_to_note(note_id, points)
+        self._invalidate_note(note_id)
+
+    def add_stroke_to_note(self, note_id: int, stroke: SketchStroke) -> SketchStroke:
+        stroke = self.note_repository.add_stroke_to_note(note_id, stroke)
+        self._invalidate_note(note_id)
+        return stroke
 
     def clear_sketch_points_for_note(self, note_id: int):
         self.note_repository.clear_sketch_points_for_note(note_id)
+        self._invalidate_note(note_id)
+
+    def get_note_sketch_arrays(self, note_id: int) -> SketchArrays:
+        # Columnar copy for bulk work on large sketches, read past the note cache
+        return self.note_repository.get_note_sketch_arrays(note_id)
 
     def verify_secure_note_password(self, note: Note, password: str) -> bool:
         if not note.is_secure or not note.secure_password:
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Optional
+from PyQt5.QtCore import QSize, Qt
+from PyQt5.QtGui import QImage, QImageReader
+
+THUMBNAIL_SIZE = 140  # Longest side in pixels, what the Images tab shows
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024  # Per user folder
+THUMBNAIL_SUFFIX = ".thumb"
+JPEG_QUALITY = 85
+
+_CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ThumbnailCache:
+    """
+    Small pre-scaled copies of note images, stored as files so they survive
+    restarts. Entries are keyed by the image's content hash and mtime, so an
+    image that changes on disk gets a new thumbnail instead of a stale one.
+
+    The folder is kept under max_bytes by deleting the least recently used
+    thumbnails; a hit refreshes the thumbnail's mtime, which is what "recently
+    used" is measured by. Safe to use from worker threads, it only touches
+    QImage, never QPixmap.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, size: int = THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.size = size
+        self._usage_bytes: Optional[int] = None  # Measured on first write
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def thumbnail_path(self, image_path: str) -> Optional[str]:
+        """Where the thumbnail of image_path is (or would be) stored, None if the image is missing"""
+        try:
+            mtime_ns = os.stat(image_path).st_mtime_ns
+        except OSError:
+            return None
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        if _CONTENT_ADDRESSED_NAME.match(stem):
+            content_key = stem  # Stored by the media store, the name is the hash
+        else:
+            # Files from before content addressing, hashing the whole file on
+            # every display would cost more than decoding it
+            content_key = hashlib.sha256(os.path.abspath(image_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{content_key}_{mtime_ns}_{self.size}{THUMBNAIL_SUFFIX}")
+
+    def get(self, image_path: str) -> Optional[QImage]:
+        path = self.thumbnail_path(image_path)
+        if path is None or not os.path.exists(path):
+            return None
+        image = QImage(path)
+        if image.isNull():
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return image
+
+    def generate(self, image_path: str) -> Optional[QImage]:
+        """Decode image_path at thumbnail size and store the result"""
+        path = self.thumbnail_path(image_path)
+        if path is None:
+            return None
+        image = self._decode_scaled(image_path)
+        if image is None:
+            return None
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        image_format = "PNG" if image.hasAlphaChannel() else "JPG"
+        if not image.save(temp_path, image_format, JPEG_QUALITY if image_format == "JPG" else -1):
+            return image  # Still usable, just not cached
+        os.replace(temp_path, path)
+
+        with self._lock:
+            if self._usage_bytes is None:
+                self._usage_bytes = self._measure_usage()
+            else:
+                self._usage_bytes += os.path.getsize(path)
+            if self._usage_bytes > self.max_bytes:
+                self._evict()
+        return image
+
+    def get_or_create(self, image_path: str) -> Optional[QImage]:
+        image = self.get(image_path)
+        return image if image is not None else self.generate(image_path)
+
+    def _decode_scaled(self, image_path: str) -> Optional[QImage]:
+        reader = QImageReader(image_path)
+        reader.setAutoTransform(True)
+        original = reader.size()
+        if original.isValid():
+            # Decoders that support it (JPEG) skip most of the full-size work
+            reader.setScaledSize(original.scaled(QSize(self.size, self.size), Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            return None
+        if image.width() > self.size or image.height() > self.size:
+            image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image
+
+    def _entries(self):
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False) and entry.name.endswith(THUMBNAIL_SUFFIX):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _measure_usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Down to 90% of the budget, so the next few writes do not evict again
+        target = self.max_bytes * 9 // 10
+        for path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._usage_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._usage_bytes -= size
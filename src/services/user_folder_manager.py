@@ -1,16 +1,21 @@
 import os
 
+USERS_FOLDER = os.path.join("data", "users")
+MEDIA_FOLDERS = ("images", "audio")
+THUMBNAILS_FOLDER = "thumbnails"  # Derived data, never scanned by the media collector
+
 
 class UserFolderManager:
     def __init__(self, username: str):
         self.username = username
-        self.folder_path = os.path.join("data", "users", username)
+        self.folder_path = os.path.join(USERS_FOLDER, username)
         self._ensure_folder_exists()
 
     def _ensure_folder_exists(self):
         os.makedirs(self.folder_path, exist_ok=True)
-        os.makedirs(os.path.join(self.folder_path, "images"), exist_ok=True)
-        os.makedirs(os.path.join(self.folder_path, "audio"), exist_ok=True)
+        for media_folder in MEDIA_FOLDERS:
+            os.makedirs(os.path.join(self.folder_path, media_folder), exist_ok=True)
+        os.makedirs(os.path.join(self.folder_path, THUMBNAILS_FOLDER), exist_ok=True)
 
     def get_images_path(self) -> str:
         return os.path.join(self.folder_path, "images") + os.sep
@@ -18,4 +23,5 @@ class UserFolderManager:
     def get_audio_path(self) -> str:
         return os.path.join(self.folder_path, "audio") + os.sep
 
-
+    def get_thumbnails_path(self) -> str:
+        return os.path.join(self.folder_path, THUMBNAILS_FOLDER) + os.sep
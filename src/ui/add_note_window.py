@@ -200,12 +200,11 @@ class AddNoteWindow(QMainWindow): # Consider using BaseWindow
 
             # NoteWindow will need to accept NoteService and UserFolderManager
             self.note_window_instance = NoteWindow(
-                self.user, new_note_obj, self.note_service, user_folder_manager, home_window_ref=self.home_window_ref
+                self.user, new_note_obj, self.note_service, user_folder_manager, home_window_ref=self.home_window_ref,
+                async_note_service=getattr(self.home_window_ref, "async_note_service", None)
             )
             self.note_window_instance.show()
-
-            if self.home_window_ref:
-                self.home_window_ref.load_notes() # Refresh notes in HomeWindow
+            # HomeWindow picks the new note up from the service's change notification
             self.deleteLater()
 
         except ValueError as e: # e.g., note name exists
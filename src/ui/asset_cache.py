@@ -0,0 +1,53 @@
+import os
+from typing import Dict, Optional
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QIcon, QPixmap, QPixmapCache
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+
+_missing_paths = set()
+_icons: Dict[str, QIcon] = {}
+
+
+def asset_path(name: str) -> str:
+    return os.path.join(ASSETS_DIR, name)
+
+
+def load_pixmap(path: str, size: Optional[int] = None) -> Optional[QPixmap]:
+    """
+    The image at path, scaled to fit size x size when given, or None if it
+    cannot be loaded. Decoded and scaled once per path and size for the
+    whole process; QPixmapCache may drop entries under memory pressure, in
+    which case the next call loads them again. UI thread only.
+    """
+    key = f"asset:{path}:{size or 0}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+    if path in _missing_paths:
+        return None
+
+    if size:
+        original = load_pixmap(path)
+        if original is None:
+            return None
+        pixmap = original.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    else:
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            print(f"Warning: Could not load asset {path}")
+            _missing_paths.add(path)
+            return None
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def load_icon(path: str) -> Optional[QIcon]:
+    """A shared QIcon for path, None if the image cannot be loaded"""
+    icon = _icons.get(path)
+    if icon is None:
+        pixmap = load_pixmap(path)
+        if pixmap is None:
+            return None
+        icon = _icons[path] = QIcon(pixmap)
+    return icon
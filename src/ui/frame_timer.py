@@ -0,0 +1,67 @@
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from PyQt5.QtCore import QRect
+
+FRAME_STATS_ENV_VAR = "NOTEMASTER_FRAME_STATS"  # Set to 1 to print paint timings
+DEFAULT_REPORT_EVERY = 120  # Frames per printed report
+
+
+def frame_stats_enabled() -> bool:
+    return os.environ.get(FRAME_STATS_ENV_VAR, "") not in ("", "0")
+
+
+@dataclass
+class FrameStats:
+    frames: int
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+    mean_pixels: float  # Painted area per frame
+
+    def __str__(self) -> str:
+        return (f"{self.frames} frames, mean {self.mean_ms:.2f} ms, p95 {self.p95_ms:.2f} ms, "
+                f"max {self.max_ms:.2f} ms, {self.mean_pixels:.0f} px painted per frame")
+
+
+class FrameTimer:
+    """
+    Times a widget's paint events and how much of it each one repainted.
+    Disabled unless NOTEMASTER_FRAME_STATS is set, when a summary is printed
+    every report_every frames.
+    """
+
+    def __init__(self, name: str, report_every: int = DEFAULT_REPORT_EVERY, enabled: Optional[bool] = None):
+        self.name = name
+        self.report_every = report_every
+        self.enabled = frame_stats_enabled() if enabled is None else enabled
+        self._samples: List[Tuple[float, int]] = []  # (seconds, pixels)
+
+    @contextmanager
+    def measure(self, rect: QRect):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._samples.append((time.perf_counter() - started, rect.width() * rect.height()))
+            if len(self._samples) >= self.report_every:
+                print(f"{self.name}: {self.take_stats()}")
+
+    def take_stats(self) -> Optional[FrameStats]:
+        """Statistics of the frames since the last call, None if there were none"""
+        samples, self._samples = self._samples, []
+        if not samples:
+            return None
+        durations = sorted(seconds for seconds, _ in samples)
+        return FrameStats(
+            frames=len(samples),
+            mean_ms=sum(durations) / len(durations) * 1000,
+            p95_ms=durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000,
+            max_ms=durations[-1] * 1000,
+            mean_pixels=sum(pixels for _, pixels in samples) / len(samples)
+        )
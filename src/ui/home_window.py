@@ -1,21 +1,24 @@
 import sys
-import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QPushButton, QListWidget,
                              QFrame, QGraphicsDropShadowEffect, QMessageBox,
                              QInputDialog, QListWidgetItem, QGridLayout,
                              QScrollArea, QSizePolicy, QLineEdit)
-from PyQt5.QtCore import Qt, QPoint, QSize
-from PyQt5.QtGui import QFont, QPixmap, QColor, QIcon
+from PyQt5.QtCore import Qt, QPoint, QSize, QTimer
+from PyQt5.QtGui import QFont, QColor
+from PyQt5 import sip
 
 # Corrected imports for refactored structure
-from src.core.interfaces import User, Note # Assuming Note also includes SecureNote concept or handled by NoteService
+from src.core.interfaces import User, Note, NoteSummary, NoteSummaryPage # Assuming Note also includes SecureNote concept or handled by NoteService
 from src.services.note_service import NoteService
+from src.services.async_note_service import AsyncNoteService
 from src.services.user_folder_manager import UserFolderManager
 from src.core.security_utils import PasswordUtils # For SecureNote password verification if not in NoteService
 
 # UI component imports - assuming these are now in shared_ui_components
 from src.ui.shared_ui_components import ModernButton # Using the refactored ModernButton
+from src.ui.asset_cache import asset_path, load_icon, load_pixmap
+from src.ui.note_grid import NoteListModel, NoteCardDelegate, NoteGridView
 # from .add_note_window import AddNoteWindow # If add_note_window is in the same dir
 # from .note_window import NoteWindow # If note_window is in the same dir
 
@@ -23,6 +26,10 @@ from src.ui.shared_ui_components import ModernButton # Using the refactored Mode
 # These will need to be created in src/ui/ and their imports adjusted.
 # For now, we'll use delayed imports for them.
 
+NOTES_PAGE_SIZE = 40 # Cards fetched per page of the notes grid
+NOTES_PREFETCH_DISTANCE = 300 # Pixels from the bottom at which the next page is requested
+MEDIA_GC_INTERVAL_SECONDS = 30 * 60 # Full sweeps for orphaned media files while signed in
+
 
 class ModernCard(QFrame): # This class can stay or be moved to shared_ui_components if used elsewhere
     def __init__(self, title, subtitle="", icon_path=""):
@@ -53,9 +60,8 @@ class ModernCard(QFrame): # This class can stay or be moved to shared_ui_compone
         top_layout = QHBoxLayout()
 
         icon_label = QLabel()
-        if icon_path and os.path.exists(icon_path):
-            pixmap = QPixmap(icon_path)
-            scaled_pixmap = pixmap.scaled(24, 24, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        scaled_pixmap = load_pixmap(icon_path, 24) if icon_path else None
+        if scaled_pixmap is not None:
             icon_label.setPixmap(scaled_pixmap)
         else:
             icon_label.setText("📄") # Default icon
@@ -96,8 +102,17 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
         super().__init__()
         self.user = user
         self.note_service = note_service
+        # Shared with the note windows opened from here so all DB work runs in one ordered queue
+        self.async_note_service = AsyncNoteService(note_service, parent=self)
         self.user_folder_manager = UserFolderManager(user.username) # For file paths
 
+        # Sweep once now for files left behind by earlier sessions, then on a
+        # schedule. Without a persistent store only released files are collected.
+        media_gc = self.note_service.media_gc
+        if media_gc.scan_filesystem:
+            media_gc.start(MEDIA_GC_INTERVAL_SECONDS)
+            media_gc.request_collection()
+
         self.setWindowTitle(f"NoteMaster - Welcome {user.username}")
         self.setFixedSize(1400, 800) # Consider making this flexible or from BaseWindow
         self.setWindowFlags(Qt.FramelessWindowHint)
@@ -145,12 +160,9 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
         layout.setContentsMargins(30, 0, 30, 0)
 
         logo_layout = QHBoxLayout()
-        # Correct asset path
-        note_icon_path = os.path.join(os.path.dirname(__file__), "assets", "note.png")
         logo_label = QLabel()
-        if os.path.exists(note_icon_path):
-            pixmap = QPixmap(note_icon_path)
-            scaled_pixmap = pixmap.scaled(32, 32, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        scaled_pixmap = load_pixmap(asset_path("note.png"), 32)
+        if scaled_pixmap is not None:
             logo_label.setPixmap(scaled_pixmap)
         else:
             logo_label.setText("📝")
@@ -225,14 +237,12 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
         actions_layout = QHBoxLayout()
         actions_layout.setSpacing(20)
 
-        addnote_icon_path = os.path.join(os.path.dirname(__file__), "assets", "addnote.png")
-        add_button = ModernButton(" New Note", primary=True, icon_path=addnote_icon_path)
+        add_button = ModernButton(" New Note", primary=True, icon_path=asset_path("addnote.png"))
         add_button.setFixedWidth(220)
         add_button.setStyleSheet(add_button.styleSheet().replace("text-align: center;", "text-align: left; padding-left: 35px;"))
         add_button.clicked.connect(self.add_note_action) # Renamed to avoid conflict
 
-        key_icon_path = os.path.join(os.path.dirname(__file__), "assets", "KEY.png")
-        secure_button = ModernButton(" Secure Note", primary=False, icon_path=key_icon_path)
+        secure_button = ModernButton(" Secure Note", primary=False, icon_path=asset_path("KEY.png"))
         secure_button.setFixedWidth(220)
         secure_button.setStyleSheet(secure_button.styleSheet().replace("text-align: center;", "text-align: left; padding-left: 35px;"))
         secure_button.clicked.connect(self.add_secure_note_action) # Renamed
@@ -251,10 +261,9 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
         title = QLabel("Your Notes")
         title.setStyleSheet("QLabel { color: #2c3e50; font-size: 24px; font-weight: bold; font-family: 'Arial', sans-serif; }")
 
-        refresh_icon_path = os.path.join(os.path.dirname(__file__), "assets", "back.png")
         refresh_button = QPushButton(" Refresh")
-        if os.path.exists(refresh_icon_path):
-            refresh_icon = QIcon(refresh_icon_path)
+        refresh_icon = load_icon(asset_path("back.png"))
+        if refresh_icon is not None:
             refresh_button.setIcon(refresh_icon)
             refresh_button.setIconSize(QSize(16, 16))
 
@@ -272,119 +281,58 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
         header_layout.addWidget(refresh_button)
         layout.addLayout(header_layout)
 
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("QScrollArea { border: none; background: transparent; }")
-
-        self.notes_container = QWidget()
-        self.notes_layout = QGridLayout(self.notes_container)
-        self.notes_layout.setSpacing(20)
-        self.notes_layout.setAlignment(Qt.AlignTop | Qt.AlignLeft)
-        scroll_area.setWidget(self.notes_container)
-        layout.addWidget(scroll_area)
+        # Cards are painted by the delegate, only the visible ones cost anything
+        self.notes_model = NoteListModel(self.async_note_service, self.user.id, NOTES_PAGE_SIZE, parent=self)
+        self.notes_model.first_page_loaded.connect(self.update_empty_state)
+        self.notes_model.loading_failed.connect(self.show_load_error)
+        for signal in (self.notes_model.rowsInserted, self.notes_model.rowsRemoved):
+            signal.connect(self.update_empty_state)
+        for signal in (self.notes_model.modelReset, self.notes_model.rowsInserted, self.notes_model.rowsRemoved):
+            signal.connect(self.schedule_fetch_more)
+        self.notes_delegate = NoteCardDelegate(self)
+        self.notes_delegate.open_requested.connect(self.open_note_action)
+        self.notes_delegate.delete_requested.connect(self.delete_note_action)
+
+        self.notes_view = NoteGridView()
+        self.notes_view.setModel(self.notes_model)
+        self.notes_view.setItemDelegate(self.notes_delegate)
+        # Further pages are fetched as the user scrolls towards the bottom
+        self.notes_view.verticalScrollBar().valueChanged.connect(self.on_notes_scrolled)
+        layout.addWidget(self.notes_view)
+
+        self.notes_empty_label = QLabel("No notes yet. Create your first note!")
+        self.notes_empty_label.setStyleSheet("QLabel { color: #7f8c8d; font-size: 16px; font-family: 'Arial', sans-serif; padding: 40px; text-align: center; }")
+        self.notes_empty_label.setAlignment(Qt.AlignCenter | Qt.AlignTop)
+        self.notes_empty_label.hide()
+        layout.addWidget(self.notes_empty_label)
         return section
 
     def load_notes(self):
-        for i in reversed(range(self.notes_layout.count())):
-            child_item = self.notes_layout.itemAt(i)
-            if child_item:
-                widget = child_item.widget()
-                if widget: widget.deleteLater()
-
-        notes = self.note_service.get_notes_for_user(self.user.id)
-        if not notes:
-            empty_label = QLabel("No notes yet. Create your first note!")
-            empty_label.setStyleSheet("QLabel { color: #7f8c8d; font-size: 16px; font-family: 'Arial', sans-serif; padding: 40px; text-align: center; }")
-            empty_label.setAlignment(Qt.AlignCenter)
-            self.notes_layout.addWidget(empty_label, 0, 0, 1, 4) # Span across 4 columns
-            return
+        # Restart from the first page, the query runs on the worker thread and
+        # the model swaps its rows when the page returns
+        self.notes_model.reload()
 
-        row, col = 0, 0
-        max_cols = 4 # Define how many cards per row
-        for note_obj in notes:
-            note_card = self.create_note_card(note_obj)
-            self.notes_layout.addWidget(note_card, row, col)
-            col = (col + 1) % max_cols
-            if col == 0:
-                row += 1
-        # Add a stretch to push items to the top-left if not enough to fill last row
-        if notes:
-            self.notes_layout.setRowStretch(row + 1, 1)
-            self.notes_layout.setColumnStretch(max_cols, 1)
-
-
-    def create_note_card(self, note: Note):
-        card = QFrame()
-        card.setFixedSize(300, 150) # Or make it responsive
-        card.setStyleSheet("""
-            QFrame { background: white; border-radius: 15px; border: 1px solid rgba(0, 0, 0, 0.1); }
-            QFrame:hover { background: #f8f9fa; border: 1px solid #667eea; }
-        """)
-        card.setCursor(Qt.PointingHandCursor)
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        shadow.setOffset(0, 5)
-        card.setGraphicsEffect(shadow)
+    def show_load_error(self, error):
+        QMessageBox.critical(self, "Error", f"Could not load notes: {error}")
 
-        layout = QVBoxLayout(card)
-        layout.setContentsMargins(20, 15, 20, 15)
-        layout.setSpacing(10)
-        header_layout = QHBoxLayout()
+    def update_empty_state(self, *args):
+        empty = self.notes_model.rowCount() == 0
+        self.notes_empty_label.setVisible(empty)
+        self.notes_view.setVisible(not empty)
 
-        icon_label = QLabel()
-        icon_base_style = "QLabel { font-size: 20px; color: #667eea; padding-right: 5px; }"
-        if note.is_secure:
-            key_icon_path = os.path.join(os.path.dirname(__file__), "assets", "KEY.png")
-            if os.path.exists(key_icon_path):
-                pixmap = QPixmap(key_icon_path).scaled(20, 20, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                icon_label.setPixmap(pixmap)
-            else:
-                icon_label.setText("🔒")
-        else:
-            note_icon_path = os.path.join(os.path.dirname(__file__), "assets", "note.png")
-            if os.path.exists(note_icon_path):
-                pixmap = QPixmap(note_icon_path).scaled(20, 20, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                icon_label.setPixmap(pixmap)
-            else:
-                icon_label.setText("📄")
-        icon_label.setStyleSheet(icon_base_style)
-
-        header_layout.addWidget(icon_label)
-        header_layout.addStretch()
+    def schedule_fetch_more(self, *args):
+        # If the loaded rows do not fill the viewport there is nothing to scroll, keep going
+        QTimer.singleShot(0, self.fetch_more_notes_if_needed)
 
-        delete_button = QPushButton()
-        exit_icon_path = os.path.join(os.path.dirname(__file__), "assets", "exit.png")
-        if os.path.exists(exit_icon_path):
-            delete_icon = QIcon(exit_icon_path)
-            delete_button.setIcon(delete_icon)
-            delete_button.setIconSize(QSize(14, 14))
-        else:
-            delete_button.setText("🗑️")
-        delete_button.setStyleSheet("""
-            QPushButton { background: transparent; border: none; font-size: 14px; padding: 3px; }
-            QPushButton:hover { background: rgba(231, 76, 60, 0.1); border-radius: 5px; }
-        """)
-        delete_button.setToolTip("Delete Note")
-        delete_button.setFixedSize(24,24)
-        delete_button.clicked.connect(lambda checked, n=note: self.delete_note_action(n)) # Renamed
-        header_layout.addWidget(delete_button)
-        layout.addLayout(header_layout)
+    def on_notes_scrolled(self, value):
+        self.fetch_more_notes_if_needed()
 
-        title_label = QLabel(note.note_name)
-        title_label.setStyleSheet("QLabel { color: #2c3e50; font-size: 16px; font-weight: bold; font-family: 'Arial', sans-serif; }")
-        title_label.setWordWrap(True)
-        layout.addWidget(title_label)
-
-        preview_text = (note.text_content[:80] + "..." if len(note.text_content or "") > 80 else note.text_content or "") or "Empty note"
-        preview_label = QLabel(preview_text)
-        preview_label.setStyleSheet("QLabel { color: #7f8c8d; font-size: 12px; font-family: 'Arial', sans-serif; }")
-        preview_label.setWordWrap(True)
-        preview_label.setFixedHeight(30)
-        layout.addWidget(preview_label)
-        layout.addStretch()
-        card.mousePressEvent = lambda event, n=note: self.open_note_action(n) # Renamed
-        return card
+    def fetch_more_notes_if_needed(self):
+        if sip.isdeleted(self) or not self.notes_model.canFetchMore():
+            return
+        scroll_bar = self.notes_view.verticalScrollBar()
+        if scroll_bar.maximum() - scroll_bar.value() <= NOTES_PREFETCH_DISTANCE:
+            self.notes_model.fetchMore()
 
     def add_note_action(self):
         self.hide()
@@ -404,7 +352,21 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
             self.add_note_window_instance = AddNoteWindow(self.user, self.note_service, self, secure_password_to_use=password)
             self.add_note_window_instance.show()
 
-    def open_note_action(self, note: Note):
+    def open_note_action(self, note_summary: NoteSummary):
+        # The grid only holds summaries, load the full note once it is actually opened
+        self.async_note_service.get_note_by_id(
+            note_summary.id, self.user.id,
+            on_result=lambda note: self.open_loaded_note(note, note_summary),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Could not open note: {e}"),
+            context=self
+        )
+
+    def open_loaded_note(self, note: Note, note_summary: NoteSummary):
+        if note is None:
+            QMessageBox.warning(self, "Note Not Found", f'Note "{note_summary.note_name}" no longer exists.')
+            self.load_notes()
+            return
+
         if note.is_secure:
             password, ok = QInputDialog.getText(self, 'Enter Password',
                                               f'Password for "{note.note_name}":', QLineEdit.Password)
@@ -420,32 +382,39 @@ class HomeWindow(QMainWindow): # BaseWindow can be used here too
 
         self.hide()
         from src.ui.note_window import NoteWindow # Delayed import
-        # NoteWindow will need to be refactored to accept NoteService and UserFolderManager or similar
-        self.note_window_instance = NoteWindow(self.user, note, self.note_service, self.user_folder_manager, home_window_ref=self)
+        self.note_window_instance = NoteWindow(self.user, note, self.note_service, self.user_folder_manager,
+                                               home_window_ref=self, async_note_service=self.async_note_service)
         self.note_window_instance.show()
 
-    def delete_note_action(self, note: Note):
+    def delete_note_action(self, note: NoteSummary):
         if QMessageBox.question(self, 'Delete Note', f'Are you sure you want to delete "{note.note_name}"?',
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes:
-            try:
-                self.note_service.delete_note(note.id, self.user.username) # Pass username for folder path
-                self.load_notes()
-                QMessageBox.information(self, "Note Deleted", f'Note "{note.note_name}" has been deleted.')
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Could not delete note: {e}")
-                print(f"Error deleting note {note.id}: {e}")
+            self.async_note_service.delete_note(
+                note.id, self.user, # User is needed for folder path
+                on_result=lambda _: self.on_note_deleted(note),
+                on_error=lambda e: self.on_note_delete_failed(note, e),
+                context=self
+            )
+
+    def on_note_deleted(self, note: NoteSummary):
+        # The grid already dropped the card on the service's change notification
+        QMessageBox.information(self, "Note Deleted", f'Note "{note.note_name}" has been deleted.')
+
+    def on_note_delete_failed(self, note: NoteSummary, error):
+        QMessageBox.critical(self, "Error", f"Could not delete note: {error}")
+        print(f"Error deleting note {note.id}: {error}")
 
 
     def sign_out(self):
         self.hide()
+        self.note_service.media_gc.stop(timeout=0) # Queued deletions still finish in the background
         # Need to import LoginWindow and pass UserService
         from src.ui.login_window import LoginWindow
         from src.services.user_service import UserService
-        from src.data.user_repository import SQLiteUserRepository
+        from src.data.repository_factory import get_repositories
 
-        # Recreate UserService if needed, or pass the existing one if HomeWindow stored it.
-        # For simplicity here, recreating. In a real app, you might pass it down or use a service locator.
-        user_repository = SQLiteUserRepository()
+        # Recreate UserService on top of the repositories selected at startup
+        user_repository = get_repositories().user_repository
         user_service = UserService(user_repository)
 
         self.login_window_instance = LoginWindow(user_service)
@@ -1,4 +1,3 @@
-import os
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -10,9 +9,10 @@ from PyQt5.QtWidgets import (
     QLineEdit,    # Added QLineEdit (though ModernLineEdit imports it, good for clarity if base used)
 )
 from PyQt5.QtCore import Qt, QPoint, QPropertyAnimation, QEasingCurve, QRect, QSize, QTimer
-from PyQt5.QtGui import QFont, QPixmap, QPalette, QBrush, QColor, QPainter, QIcon
+from PyQt5.QtGui import QFont, QPalette, QBrush, QColor, QPainter
 
 from src.ui.shared_ui_components import ModernButton, ModernLineEdit
+from src.ui.asset_cache import asset_path, load_pixmap
 from src.services.user_service import UserService
 from src.ui.base_window import BaseWindow
 from src.ui.styles import login_window_styles as styles
@@ -55,13 +55,9 @@ class LoginWindow(BaseWindow):
         logo_layout.setAlignment(Qt.AlignCenter)
         logo_layout.setSpacing(20)
 
-        note_icon_path = os.path.join(os.path.dirname(__file__), "assets", "note.png")
         app_icon = QLabel()
-        if os.path.exists(note_icon_path):
-            pixmap = QPixmap(note_icon_path)
-            scaled_pixmap = pixmap.scaled(
-                120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
+        scaled_pixmap = load_pixmap(asset_path("note.png"), 120)
+        if scaled_pixmap is not None:
             app_icon.setPixmap(scaled_pixmap)
             app_icon.setStyleSheet(styles.APP_ICON_LABEL_STYLE_IMAGE)
         else:
@@ -179,7 +175,7 @@ class LoginWindow(BaseWindow):
             # Delayed import to avoid circular dependencies at module level
             from src.ui.home_window import HomeWindow # Corrected path
             from src.services.note_service import NoteService
-            from src.data.note_repository import SQLiteNoteRepository
+            from src.data.repository_factory import get_repositories
             # Ensure UserFolderManager is initialized if needed by HomeWindow or NoteService
             # For now, assuming User object passed to HomeWindow is sufficient.
             # If HomeWindow creates notes or NoteService needs user folder for new notes,
@@ -187,7 +183,7 @@ class LoginWindow(BaseWindow):
             # User object should ideally carry its username for UserFolderManager.
             
             # Create note_service
-            note_repository = SQLiteNoteRepository()
+            note_repository = get_repositories().note_repository
             note_service = NoteService(note_repository)
 
             self.home_window = HomeWindow(user, note_service)
@@ -0,0 +1,322 @@
+from typing import List, Optional, Sequence, Set
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QCursor, QFont, QFontMetrics, QPainter, QPen
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate, QListView, QAbstractItemView
+from src.core.interfaces import NoteCursor, NoteSummary, NoteSummaryPage
+from src.services.async_note_service import AsyncNoteService
+from src.services.note_service import NoteChange, NOTE_DELETED
+from src.ui.asset_cache import asset_path, load_pixmap
+
+NOTE_CARD_WIDTH = 300
+NOTE_CARD_HEIGHT = 150
+NOTE_CARD_SHADOW = 6  # Room below each card for its painted shadow
+NOTE_GRID_SPACING = 20
+DEFAULT_PAGE_SIZE = 40
+
+
+
+class NoteListModel(QAbstractListModel):
+    """
+    A user's note summaries, newest first, loaded a page at a time through
+    the async note service. Views pull further pages with fetchMore() as
+    they scroll.
+
+    After the first page the model follows NoteService change notifications:
+    deleted notes lose their row, created and updated notes are re-read in
+    one batch per event loop pass and inserted, moved or changed in place.
+    Nothing else is reloaded.
+    """
+
+    SummaryRole = Qt.UserRole + 1
+
+    first_page_loaded = pyqtSignal()
+    loading_failed = pyqtSignal(object)
+
+    def __init__(self, async_note_service: AsyncNoteService, user_id: int,
+                 page_size: int = DEFAULT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.async_note_service = async_note_service
+        self.user_id = user_id
+        self.page_size = page_size
+        self._summaries: List[NoteSummary] = []
+        self._next_cursor: Optional[NoteCursor] = None
+        self._loading = False
+        self._request_id = 0
+        self._pending_ids: Set[int] = set()
+        async_note_service.note_changed.connect(self.on_note_changed)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._summaries)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._summaries):
+            return None
+        summary = self._summaries[index.row()]
+        if role == self.SummaryRole:
+            return summary
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return summary.note_name
+        return None
+
+    def summary_at(self, row: int) -> NoteSummary:
+        return self._summaries[row]
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._next_cursor is not None and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request_page(self._next_cursor)
+
+    def reload(self):
+        """Start again from the first page, the current rows stay until it arrives"""
+        self._request_id += 1
+        self._loading = False
+        self._request_page(None)
+
+    def _request_page(self, after: Optional[NoteCursor]):
+        self._loading = True
+        request_id = self._request_id
+        self.async_note_service.list_note_summaries(
+            self.user_id, self.page_size, after,
+            on_result=lambda page: self._on_page(page, request_id, after is None),
+            on_error=lambda error: self._on_error(error, request_id),
+            context=self
+        )
+
+    def _on_page(self, page: NoteSummaryPage, request_id: int, first_page: bool):
+        if request_id != self._request_id:
+            return  # A reload started while this page was in flight
+        self._loading = False
+        if first_page:
+            self.beginResetModel()
+            self._summaries = list(page.summaries)
+            self._next_cursor = page.next_cursor
+            self.endResetModel()
+            self.first_page_loaded.emit()
+        elif page.summaries:
+            start = len(self._summaries)
+            self.beginInsertRows(QModelIndex(), start, start + len(page.summaries) - 1)
+            self._summaries.extend(page.summaries)
+            self._next_cursor = page.next_cursor
+            self.endInsertRows()
+        else:
+            self._next_cursor = page.next_cursor
+
+    def _on_error(self, error: Exception, request_id: int):
+        if request_id == self._request_id:
+            self._loading = False
+            self.loading_failed.emit(error)
+
+    # Incremental updates
+
+    def on_note_changed(self, change: NoteChange):
+        if change.user_id is not None and change.user_id != self.user_id:
+            return
+        if change.kind == NOTE_DELETED:
+            self._pending_ids.discard(change.note_id)
+            row = self._row_of(change.note_id)
+            if row is not None:
+                self._remove_row(row)
+            return
+        if not self._pending_ids:
+            # Changes made together (a save, then a stroke, ...) share one query
+            QTimer.singleShot(0, self._refresh_pending)
+        self._pending_ids.add(change.note_id)
+
+    def _refresh_pending(self):
+        note_ids = list(self._pending_ids)
+        self._pending_ids.clear()
+        if note_ids:
+            self.async_note_service.get_note_summaries_by_ids(
+                self.user_id, note_ids,
+                on_result=lambda summaries: self._apply_summaries(note_ids, summaries), context=self
+            )
+
+    def _apply_summaries(self, note_ids: List[int], summaries: List[NoteSummary]):
+        found = {summary.id: summary for summary in summaries}
+        for note_id in note_ids:
+            summary = found.get(note_id)
+            if summary is not None:
+                self._place(summary)
+            else:
+                # Deleted meanwhile, or not this user's note
+                row = self._row_of(note_id)
+                if row is not None:
+                    self._remove_row(row)
+
+    def _row_of(self, note_id: int) -> Optional[int]:
+        for row, summary in enumerate(self._summaries):
+            if summary.id == note_id:
+                return row
+        return None
+
+    def _target_row(self, rows: Sequence[NoteSummary], summary: NoteSummary) -> Optional[int]:
+        """Where summary sorts among rows, None if it belongs to a page not loaded yet"""
+        key = (summary.updated_at, summary.id)
+        for row, other in enumerate(rows):
+            if (other.updated_at, other.id) < key:
+                return row
+        return len(rows) if self._next_cursor is None else None
+
+    def _place(self, summary: NoteSummary):
+        row = self._row_of(summary.id)
+        if row is None:
+            target = self._target_row(self._summaries, summary)
+            if target is not None:
+                self.beginInsertRows(QModelIndex(), target, target)
+                self._summaries.insert(target, summary)
+                self.endInsertRows()
+            return
+        if self._summaries[row] == summary:
+            return
+
+        others = self._summaries[:row] + self._summaries[row + 1:]
+        target = self._target_row(others, summary)
+        if target is None:
+            self._remove_row(row)
+        elif target == row:
+            self._summaries[row] = summary
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+        else:
+            # Qt counts the destination before the row is taken out
+            self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target if target < row else target + 1)
+            del self._summaries[row]
+            self._summaries.insert(target, summary)
+            self.endMoveRows()
+            index = self.index(target)
+            self.dataChanged.emit(index, index)
+
+    def _remove_row(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._summaries[row]
+        self.endRemoveRows()
+
+
+class NoteCardDelegate(QStyledItemDelegate):
+    """
+    Paints a note card straight onto the view, so a card costs nothing
+    until it scrolls into sight and nothing once it scrolls out again.
+    """
+
+    open_requested = pyqtSignal(object)  # NoteSummary
+    delete_requested = pyqtSignal(object)  # NoteSummary
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.note_icon = load_pixmap(asset_path("note.png"), 20)
+        self.secure_icon = load_pixmap(asset_path("KEY.png"), 20)
+        self.delete_icon = load_pixmap(asset_path("exit.png"), 14)
+        # Same sizes the card labels used in their stylesheets
+        self.title_font = self._font(16, bold=True)
+        self.preview_font = self._font(12)
+        self.emoji_font = self._font(20)
+
+    @staticmethod
+    def _font(pixel_size: int, bold: bool = False) -> QFont:
+        font = QFont("Arial")
+        font.setPixelSize(pixel_size)
+        font.setBold(bold)
+        return font
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(NOTE_CARD_WIDTH, NOTE_CARD_HEIGHT + NOTE_CARD_SHADOW)
+
+    @staticmethod
+    def card_rect(item_rect: QRect) -> QRect:
+        return QRect(item_rect.left(), item_rect.top(), NOTE_CARD_WIDTH, NOTE_CARD_HEIGHT)
+
+    @classmethod
+    def delete_button_rect(cls, item_rect: QRect) -> QRect:
+        card = cls.card_rect(item_rect)
+        return QRect(card.right() - 20 - 24, card.top() + 15, 24, 24)
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        summary: NoteSummary = index.data(NoteListModel.SummaryRole)
+        if summary is None:
+            return
+        card = self.card_rect(option.rect)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Two offset translucent layers stand in for a blurred drop shadow
+        painter.setPen(Qt.NoPen)
+        for offset, alpha in ((NOTE_CARD_SHADOW, 10), (NOTE_CARD_SHADOW // 2, 16)):
+            painter.setBrush(QColor(0, 0, 0, alpha))
+            painter.drawRoundedRect(card.translated(0, offset), 15, 15)
+
+        painter.setBrush(QColor("#f8f9fa") if hovered else QColor("white"))
+        painter.setPen(QPen(QColor("#667eea") if hovered else QColor(0, 0, 0, 25), 1))
+        painter.drawRoundedRect(card.adjusted(0, 0, -1, -1), 15, 15)
+
+        content = card.adjusted(20, 15, -20, -15)
+        icon = self.secure_icon if summary.is_secure else self.note_icon
+        if icon is not None:
+            painter.drawPixmap(content.left(), content.top() + 2, icon)
+        else:
+            painter.setFont(self.emoji_font)
+            painter.setPen(QColor("#667eea"))
+            painter.drawText(QRect(content.left(), content.top(), 24, 24), Qt.AlignCenter, "🔒" if summary.is_secure else "📄")
+
+        delete_rect = self.delete_button_rect(option.rect)
+        if hovered and option.widget is not None:
+            cursor = option.widget.viewport().mapFromGlobal(QCursor.pos())
+            if delete_rect.contains(cursor):
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(231, 76, 60, 25))
+                painter.drawRoundedRect(delete_rect, 5, 5)
+        if self.delete_icon is not None:
+            painter.drawPixmap(delete_rect.center().x() - self.delete_icon.width() // 2,
+                               delete_rect.center().y() - self.delete_icon.height() // 2, self.delete_icon)
+        else:
+            painter.setFont(self.preview_font)
+            painter.drawText(delete_rect, Qt.AlignCenter, "🗑️")
+
+        title_rect = QRect(content.left(), content.top() + 34, content.width(), 24)
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("#2c3e50"))
+        title = QFontMetrics(self.title_font).elidedText(summary.note_name, Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignVCenter, title)
+
+        preview_rect = QRect(content.left(), title_rect.bottom() + 8, content.width(), 32)
+        painter.setFont(self.preview_font)
+        painter.setPen(QColor("#7f8c8d"))
+        painter.drawText(preview_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, summary.preview or "Empty note")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            summary = index.data(NoteListModel.SummaryRole)
+            if summary is not None:
+                if self.delete_button_rect(option.rect).contains(event.pos()):
+                    self.delete_requested.emit(summary)
+                    return True
+                if self.card_rect(option.rect).contains(event.pos()):
+                    self.open_requested.emit(summary)
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+
+class NoteGridView(QListView):
+    """Icon-mode list view that lays the painted cards out as a wrapping grid"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)  # Layout without asking every item for its size
+        self.setSpacing(NOTE_GRID_SPACING // 2)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setMouseTracking(True)  # Hover highlight
+        self.viewport().setCursor(Qt.PointingHandCursor)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setStyleSheet("QListView { border: none; background: transparent; }")
@@ -1,45 +1,99 @@
 import sys
 import os
-import shutil
+from dataclasses import replace
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
                              QFrame, QGraphicsDropShadowEffect, QTabWidget,
                              QTextEdit, QColorDialog, QFileDialog, QMessageBox,
                              QSlider, QScrollArea, QGridLayout)
-from PyQt5.QtCore import Qt, QPoint, QSize, QTimer, QBuffer, QIODevice
+from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF, QRect, QRectF, QSize, QTimer, QBuffer, QIODevice
+from PyQt5 import sip
 from PyQt5.QtGui import (QFont, QColor, QPainter, QPen, QPixmap, QImage,
-                         QPainterPath, QBrush)
+                         QPainterPath, QBrush, QPolygonF, QGuiApplication)
 
 # Corrected imports for refactored structure
-from src.core.interfaces import User, Note, SketchPoint, NoteImage, NoteAudio
+from src.core.interfaces import User, Note, SketchStroke, NoteImage, NoteAudio
+from src.core.stroke_geometry import catmull_rom_segments, simplify_points, simplify_tolerance
 from src.services.note_service import NoteService
+from src.services.async_note_service import AsyncNoteService
 from src.services.user_folder_manager import UserFolderManager
+from src.services.media_store import MediaStore
+from src.services.thumbnail_cache import ThumbnailCache
+from src.ui.thumbnail_loader import ThumbnailLoader
+from src.ui.frame_timer import FrameTimer
 from src.ui.shared_ui_components import ModernButton
 
-from typing import List # <--- IMPORT List HERE
+from typing import Dict, List, Optional # <--- IMPORT List HERE
 
 import wave
 import pyaudio 
 import threading
-import time
+
+DEFAULT_FRAME_INTERVAL_MS = 16  # Render tick when the screen reports no refresh rate
+MIN_TABLET_PRESSURE = 0.1  # A barely touching pen still leaves a visible line
+
+
+def stroke_pen(stroke: SketchStroke) -> QPen:
+    pen = QPen(QColor.fromRgbF(stroke.red, stroke.green, stroke.blue, stroke.opacity))
+    pen.setWidthF(stroke.size)
+    pen.setCapStyle(Qt.RoundCap)
+    pen.setJoinStyle(Qt.RoundJoin)
+    return pen
+
+
+def stroke_path(stroke: SketchStroke) -> QPainterPath:
+    """
+    One curve through all of the stroke's points, so it is drawn in a single
+    call. Strokes are stored simplified, the spline restores their roundness.
+    """
+    path = QPainterPath(QPointF(*stroke.points[0]))
+    cubic_to = path.cubicTo
+    for (c1x, c1y), (c2x, c2y), (x, y) in catmull_rom_segments(stroke.points):
+        cubic_to(c1x, c1y, c2x, c2y, x, y)
+    return path
+
 
 class CanvasWidget(QWidget):
-    def __init__(self, note_id: int, note_service: NoteService, initial_points: List[SketchPoint]): # Added type hint for initial_points
+    """
+    Sketch surface backed by a pixmap. Pointer samples (mouse or tablet) are
+    buffered as they arrive and drawn once per display frame by a render
+    tick, so a 1000 Hz device costs one painter pass per frame, not one per
+    event. Each pass invalidates only the bounds of what it drew.
+    """
+
+    def __init__(self, note_id: int, async_note_service: AsyncNoteService, initial_strokes: List[SketchStroke]):
         super().__init__()
         self.note_id = note_id
-        self.note_service = note_service
-        self.points = initial_points 
-        self.newly_added_points = [] 
+        self.async_note_service = async_note_service
+        self.strokes: List[SketchStroke] = []
+        self.stroke_paths: List[QPainterPath] = [] # Built once per stroke, a resize only replays them
+        self.current_stroke = None # Stroke being captured until the pointer is released
+        self.stroke_pressures: List[float] = []
+        self.live_damage = QRect() # Everything the live stroke has drawn on the pixmap
 
         self.drawing = False
-        self.last_point = None
+        self.last_point: Optional[QPointF] = None # Last sample already drawn
+        self.pending_points: List[QPointF] = [] # Captured since the last render tick
+        self.pending_pressures: List[float] = []
+        self.render_timer = QTimer(self)
+        self.render_timer.setTimerType(Qt.PreciseTimer)
+        self.render_timer.timeout.connect(self.flush_pending_input)
+
         self.brush_size = 5
         self.brush_color = QColor(0, 0, 0)
         self.setMinimumSize(800, 500)
+        # paintEvent covers its whole rect from the pixmap, no need to clear it first
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.frame_timer = FrameTimer("Canvas paint")
 
         self.pixmap = QPixmap(self.size())
         self.pixmap.fill(Qt.white)
 
+        self.set_strokes(initial_strokes)
+
+    def set_strokes(self, strokes: List[SketchStroke]):
+        self.strokes = [stroke for stroke in strokes if stroke.points]
+        self.stroke_paths = [stroke_path(stroke) for stroke in self.strokes]
         self.redraw_from_db_points()
 
     def redraw_from_db_points(self):
@@ -47,112 +101,176 @@ class CanvasWidget(QWidget):
         painter = QPainter(self.pixmap)
         painter.setRenderHint(QPainter.Antialiasing, True)
 
-        # Draw existing points from DB as connected lines for each stroke
-        # This simple version assumes points are ordered per stroke in the DB
-        # A more robust solution would involve stroke IDs or saving segments.
-        if not self.points:
-            painter.end()
-            self.update()
-            return
+        # One pen and one draw call per stroke, whatever its point count
+        for stroke, path in zip(self.strokes, self.stroke_paths):
+            self.draw_stroke(painter, stroke, path)
 
-        current_stroke_points_qt = []
-        # It's tricky to perfectly reconstruct strokes without stroke IDs.
-        # For now, let's try drawing lines between consecutive points if they have the same brush.
-        # This is a simplification.
-        
-        last_pen_props = None
-
-        for i in range(len(self.points)):
-            point_data = self.points[i]
-            current_qt_point = QPoint(int(point_data.x), int(point_data.y))
-            
-            pen = QPen()
-            pen.setWidth(int(point_data.size))
-            pen.setColor(QColor.fromRgbF(point_data.red, point_data.green, point_data.blue, point_data.opacity))
-            pen.setCapStyle(Qt.RoundCap)
-            pen.setJoinStyle(Qt.RoundJoin)
-            
-            painter.setPen(pen)
-
-            if i > 0:
-                # Basic heuristic: if brush properties are the same, assume it's a continued line
-                prev_point_data = self.points[i-1]
-                if (int(prev_point_data.size) == int(point_data.size) and
-                    (prev_point_data.red, prev_point_data.green, prev_point_data.blue, prev_point_data.opacity) == \
-                    (point_data.red, point_data.green, point_data.blue, point_data.opacity)):
-                    prev_qt_point = QPoint(int(prev_point_data.x), int(prev_point_data.y))
-                    painter.drawLine(prev_qt_point, current_qt_point)
-                else: # Brush changed, start new point/stroke
-                    painter.drawPoint(current_qt_point)
-            else: # First point
-                painter.drawPoint(current_qt_point)
-        
         painter.end()
         self.update()
 
+    def redraw_region(self, rect: QRect):
+        """Repaint rect of the pixmap from the strokes that pass through it"""
+        painter = QPainter(self.pixmap)
+        painter.setClipRect(rect)
+        painter.fillRect(rect, Qt.white)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        bounds = QRectF(rect)
+        for stroke, path in zip(self.strokes, self.stroke_paths):
+            margin = stroke.size / 2 + 2
+            if path.controlPointRect().adjusted(-margin, -margin, margin, margin).intersects(bounds):
+                self.draw_stroke(painter, stroke, path)
+        painter.end()
+        self.update(rect)
+
+    @staticmethod
+    def draw_stroke(painter: QPainter, stroke: SketchStroke, path: QPainterPath):
+        painter.setPen(stroke_pen(stroke))
+        if len(stroke.points) == 1:
+            painter.drawPoint(QPointF(*stroke.points[0])) # A lone moveTo would draw nothing
+        else:
+            painter.drawPath(path)
+
     def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.drawPixmap(0, 0, self.pixmap)
+        # Only the damaged part, new input invalidates just its own bounds
+        rect = event.rect()
+        with self.frame_timer.measure(rect):
+            painter = QPainter(self)
+            painter.drawPixmap(rect, self.pixmap, rect)
+            painter.end()
+
+    @staticmethod
+    def damage_rect(bounds: QRectF, pen_width: float) -> QRect:
+        """What drawing within bounds touches, widened by the pen and antialiasing"""
+        margin = pen_width / 2 + 2
+        return bounds.adjusted(-margin, -margin, margin, margin).toAlignedRect()
 
     def resizeEvent(self, event):
         if self.pixmap.size() != self.size():
-            new_pixmap = QPixmap(self.size())
-            new_pixmap.fill(Qt.white)
-            painter = QPainter(new_pixmap)
-            painter.drawPixmap(0, 0, self.pixmap)
-            painter.end()
-            self.pixmap = new_pixmap
-            self.redraw_from_db_points() 
+            # Replayed from the strokes, copying the old pixmap first would be wasted
+            self.pixmap = QPixmap(self.size())
+            self.redraw_from_db_points()
+
+    def frame_interval_ms(self) -> int:
+        window = self.window().windowHandle()
+        screen = window.screen() if window else QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 0
+        return max(1, int(1000 / refresh_rate)) if refresh_rate > 0 else DEFAULT_FRAME_INTERVAL_MS
+
+    def pen_for_pressure(self, pressure: float) -> QPen:
+        return QPen(self.brush_color, self.brush_size * pressure, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+
+    # Pointer input, shared by mouse and tablet
+
+    def begin_stroke(self, pos: QPointF, pressure: float = 1.0):
+        self.drawing = True
+        self.current_stroke = SketchStroke(
+            float(self.brush_size),
+            self.brush_color.redF(), self.brush_color.greenF(),
+            self.brush_color.blueF(), self.brush_color.alphaF()
+        )
+        self.current_stroke.points.append((pos.x(), pos.y()))
+        self.stroke_pressures = [pressure]
+        self.last_point = pos
+
+        # The first dot is drawn right away, a press should never feel late
+        pen = self.pen_for_pressure(pressure)
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(pen)
+        painter.drawPoint(pos)
+        painter.end()
+        self.live_damage = self.damage_rect(QRectF(pos, pos), pen.widthF())
+        self.update(self.live_damage)
+
+    def extend_stroke(self, pos: QPointF, pressure: float = 1.0):
+        self.current_stroke.points.append((pos.x(), pos.y()))
+        self.stroke_pressures.append(pressure)
+        self.pending_points.append(pos)
+        self.pending_pressures.append(pressure)
+        if not self.render_timer.isActive():
+            self.render_timer.start(self.frame_interval_ms())
+
+    def flush_pending_input(self):
+        """Draw everything captured since the last tick in one painter pass"""
+        if not self.pending_points:
+            self.render_timer.stop() # Idle until the next sample
+            return
+        polyline = QPolygonF([self.last_point] + self.pending_points)
+        pen = self.pen_for_pressure(sum(self.pending_pressures) / len(self.pending_pressures))
+        self.last_point = self.pending_points[-1]
+        self.pending_points = []
+        self.pending_pressures = []
 
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.drawing = True
-            self.last_point = event.pos()
-
-            point_data = SketchPoint(
-                float(event.pos().x()), float(event.pos().y()),
-                float(self.brush_size),
-                self.brush_color.redF(), self.brush_color.greenF(),
-                self.brush_color.blueF(), self.brush_color.alphaF()
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(pen)
+        painter.drawPolyline(polyline)
+        painter.end()
+        damage = self.damage_rect(polyline.boundingRect(), pen.widthF())
+        self.live_damage = self.live_damage.united(damage)
+        self.update(damage)
+
+    def end_stroke(self):
+        self.flush_pending_input()
+        self.render_timer.stop()
+        self.drawing = False
+        stroke = self.current_stroke
+        if stroke and stroke.points:
+            # Strokes keep one brush, a pressure-sensitive stroke is stored at its mean width
+            stroke.size = self.brush_size * sum(self.stroke_pressures) / len(self.stroke_pressures)
+            # Raw samples are mostly collinear, keep only what shapes the stroke
+            stroke.points = simplify_points(stroke.points, simplify_tolerance(stroke.size))
+            path = stroke_path(stroke)
+            self.strokes.append(stroke)
+            self.stroke_paths.append(path)
+            # Swap the live polyline for the stored curve, so a reload looks the same.
+            # Simplification may pull the curve inside the polyline, so both are repainted.
+            curve_damage = self.damage_rect(path.controlPointRect(), stroke.size)
+            self.redraw_region(self.live_damage.united(curve_damage))
+            # Saved in the background, the stroke is already on screen. The
+            # worker gets its own copy, only the UI thread touches self.strokes
+            self.async_note_service.add_stroke_to_note(
+                self.note_id, replace(stroke, points=list(stroke.points)),
+                on_result=lambda saved: setattr(stroke, "id", saved.id),
+                on_error=lambda e: self.discard_unsaved_stroke(stroke, e),
+                context=self
             )
-            self.newly_added_points.append(point_data)
+        self.current_stroke = None
+        self.stroke_pressures = []
+        self.live_damage = QRect()
+
+    def discard_unsaved_stroke(self, stroke: SketchStroke, error: Exception):
+        # Taken off the canvas too, so the screen shows what a reload would
+        QMessageBox.critical(self, "Error", f"Could not save drawing: {error}")
+        for index, kept in enumerate(self.strokes):
+            if kept is stroke:
+                del self.strokes[index]
+                del self.stroke_paths[index]
+                self.redraw_from_db_points()
+                break
 
-            painter = QPainter(self.pixmap)
-            painter.setRenderHint(QPainter.Antialiasing, True)
-            pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            painter.setPen(pen)
-            painter.drawPoint(event.pos())
-            painter.end()
-            self.update()
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.begin_stroke(QPointF(event.pos()))
 
     def mouseMoveEvent(self, event):
         if (event.buttons() & Qt.LeftButton) and self.drawing:
-            point_data = SketchPoint(
-                float(event.pos().x()), float(event.pos().y()),
-                float(self.brush_size),
-                self.brush_color.redF(), self.brush_color.greenF(),
-                self.brush_color.blueF(), self.brush_color.alphaF()
-            )
-            self.newly_added_points.append(point_data)
-
-            painter = QPainter(self.pixmap)
-            painter.setRenderHint(QPainter.Antialiasing, True)
-            pen = QPen(self.brush_color, self.brush_size, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
-            painter.setPen(pen)
-            painter.drawLine(self.last_point, event.pos())
-            self.last_point = event.pos()
-            painter.end()
-            self.update()
+            self.extend_stroke(QPointF(event.pos()))
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton and self.drawing:
-            self.drawing = False
-            if self.newly_added_points:
-                for p_data in self.newly_added_points:
-                    self.note_service.add_sketch_point_to_note(self.note_id, p_data)
-                self.points.extend(self.newly_added_points) 
-                self.newly_added_points = [] 
-
+            self.end_stroke()
+
+    def tabletEvent(self, event):
+        # Accepted, so Qt does not synthesize mouse events for the same input
+        pressure = max(MIN_TABLET_PRESSURE, event.pressure())
+        if event.type() == QEvent.TabletPress and event.button() == Qt.LeftButton:
+            self.begin_stroke(event.posF(), pressure)
+        elif event.type() == QEvent.TabletMove and self.drawing:
+            self.extend_stroke(event.posF(), pressure)
+        elif event.type() == QEvent.TabletRelease and self.drawing:
+            self.end_stroke()
+        event.accept()
 
     def set_brush_size(self, size):
         self.brush_size = size
@@ -161,16 +279,28 @@ class CanvasWidget(QWidget):
         self.brush_color = color
 
     def clear_canvas_content(self): 
-        self.note_service.clear_sketch_points_for_note(self.note_id)
-        self.points = [] 
-        self.newly_added_points = []
+        cleared = self.strokes
+        self.render_timer.stop()
+        self.strokes = []
+        self.stroke_paths = []
+        self.current_stroke = None
+        self.drawing = False
+        self.pending_points = []
+        self.pending_pressures = []
+        self.live_damage = QRect()
         self.pixmap.fill(Qt.white)
         self.update()
+        self.async_note_service.clear_sketch_points_for_note(
+            self.note_id, on_error=lambda e: self.restore_cleared_strokes(cleared, e), context=self
+        )
 
-    # This method was causing the NameError
-    def get_all_points_for_saving(self) -> List[SketchPoint]:
-        # This method might not be needed if points are saved per stroke/release
-        return self.points
+    def restore_cleared_strokes(self, cleared: List[SketchStroke], error: Exception):
+        # The old strokes are still stored, strokes drawn since were saved after them
+        QMessageBox.critical(self, "Error", f"Could not clear drawing: {error}")
+        self.set_strokes(cleared + self.strokes)
+
+    def get_all_strokes(self) -> List[SketchStroke]:
+        return self.strokes
 
 
 class ImageThumbnail(QLabel):
@@ -181,22 +311,23 @@ class ImageThumbnail(QLabel):
         self.setAlignment(Qt.AlignCenter)
         self.setStyleSheet("""
             QLabel {
-                background: white; border: 1px solid #ddd; border-radius: 5px; padding: 5px;
+                background: white; border: 1px solid #ddd; border-radius: 5px; padding: 5px; color: #adb5bd;
             }
             QLabel:hover { border: 1px solid #667eea; }
         """)
-        pixmap = QPixmap(image_path)
-        if not pixmap.isNull():
-            pixmap = pixmap.scaled(140, 140, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.setPixmap(pixmap)
-        else:
-            self.setText("Invalid Image")
+        self.setText("Loading...") # Placeholder until the thumbnail loader delivers
         shadow = QGraphicsDropShadowEffect()
         shadow.setBlurRadius(10)
         shadow.setColor(QColor(0, 0, 0, 50))
         shadow.setOffset(0, 3)
         self.setGraphicsEffect(shadow)
 
+    def set_thumbnail(self, pixmap: Optional[QPixmap]):
+        if pixmap is not None:
+            self.setPixmap(pixmap)
+        else:
+            self.setText("Invalid Image")
+
 
 class AudioRecorder:
     def __init__(self, output_path):
@@ -314,12 +445,18 @@ class AudioPlayer:
 
 
 class NoteWindow(QMainWindow): 
-    def __init__(self, user: User, note: Note, note_service: NoteService, user_folder_manager: UserFolderManager, home_window_ref=None):
+    def __init__(self, user: User, note: Note, note_service: NoteService, user_folder_manager: UserFolderManager, home_window_ref=None,
+                 async_note_service: AsyncNoteService = None):
         super().__init__()
         self.user = user
         self.note = note 
         self.note_service = note_service
+        # Pass the HomeWindow's facade so saves here are ordered before its reloads
+        self.async_note_service = async_note_service or AsyncNoteService(note_service, parent=self)
         self.user_folder_manager = user_folder_manager
+        self.thumbnail_loader = ThumbnailLoader(ThumbnailCache(user_folder_manager.get_thumbnails_path()), parent=self)
+        self.thumbnail_loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.image_thumbnails: Dict[str, List[ImageThumbnail]] = {} # Widgets waiting for each path
         self.home_window_ref = home_window_ref
 
         self.setWindowTitle(f"NoteMaster - {note.note_name}")
@@ -329,9 +466,10 @@ class NoteWindow(QMainWindow):
         self.drag_position = QPoint()
         self.audio_recorder = None
         self.audio_player = None
+        self.saved_text: Optional[str] = None # Editor text as last loaded or saved
 
         self.init_ui()
-        self.load_note_data()
+        self.apply_note_data(self.note) # The caller hands over a freshly loaded note
 
     def init_ui(self):
         main_widget = QWidget()
@@ -405,14 +543,22 @@ class NoteWindow(QMainWindow):
         self.create_audio_tab()
 
     def load_note_data(self):
-        # Reload note from DB to get freshest data, including media lists
-        updated_note = self.note_service._get_note_by_id(self.note.id, self.user.id) # Use the helper if available
+        # Reload note from DB in the background to get freshest data, including media lists
+        self.async_note_service.get_note_by_id(
+            self.note.id, self.user.id, on_result=self.apply_note_data, on_error=self.show_load_error, context=self
+        )
+
+    def show_load_error(self, error):
+        QMessageBox.warning(self, "Error", f"Could not reload note: {error}")
+
+    def apply_note_data(self, updated_note: Note):
         if updated_note:
             self.note = updated_note # Update local note object
 
         self.text_editor.setText(self.note.text_content or "")
-        self.canvas.points = self.note.sketch_points # Update canvas points
-        self.canvas.redraw_from_db_points()
+        # As the editor reports it, so text it reformats on load does not count as an edit
+        self.saved_text = self.text_editor.toPlainText()
+        self.canvas.set_strokes(self.note.sketch_strokes)
         self.refresh_images_display()
         self.refresh_audio_display()
 
@@ -451,7 +597,7 @@ class NoteWindow(QMainWindow):
         layout.addLayout(controls_layout)
         canvas_scroll = QScrollArea(); canvas_scroll.setWidgetResizable(True)
         canvas_scroll.setStyleSheet("QScrollArea { border: 1px solid #ddd; border-radius: 5px; background: white; }")
-        self.canvas = CanvasWidget(self.note.id, self.note_service, self.note.sketch_points)
+        self.canvas = CanvasWidget(self.note.id, self.async_note_service, self.note.sketch_strokes)
         canvas_scroll.setWidget(self.canvas)
         layout.addWidget(canvas_scroll)
         self.tab_widget.addTab(tab, "Drawing")
@@ -498,9 +644,14 @@ class NoteWindow(QMainWindow):
         for i in reversed(range(self.images_layout.count())):
             widget = self.images_layout.itemAt(i).widget()
             if widget: widget.deleteLater()
+        self.image_thumbnails = {}
         row, col, max_cols = 0,0,4
         for image_obj in self.note.image_paths: 
-            thumbnail = ImageThumbnail(image_obj.image_path) 
+            thumbnail = ImageThumbnail(image_obj.image_path)
+            if self.thumbnail_loader.request(image_obj.image_path):
+                thumbnail.set_thumbnail(self.thumbnail_loader.pixmap(image_obj.image_path))
+            else:
+                self.image_thumbnails.setdefault(image_obj.image_path, []).append(thumbnail)
             container = QWidget(); container_layout = QVBoxLayout(container); container_layout.setSpacing(5)
             name_label = QLabel(os.path.basename(image_obj.image_path)) 
             name_label.setStyleSheet("QLabel { color: #495057; font-size: 12px; text-align: center; }")
@@ -544,40 +695,49 @@ class NoteWindow(QMainWindow):
     def handle_add_image(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Add Image", "", "Images (*.png *.jpg *.jpeg *.bmp *.gif)")
         if file_path:
-            images_dir = self.user_folder_manager.get_images_path() 
-            os.makedirs(images_dir, exist_ok=True)
-            dest_filename = os.path.basename(file_path)
-            dest_path = os.path.join(images_dir, dest_filename)
-            count = 1
-            name, ext = os.path.splitext(dest_filename)
-            while os.path.exists(dest_path):
-                dest_filename = f"{name}_{count}{ext}"
-                dest_path = os.path.join(images_dir, dest_filename)
-                count += 1
-            try:
-                shutil.copy2(file_path, dest_path)
-                self.note_service.add_image_to_note(self.note.id, dest_path)
-                # self.note.image_paths.append(NoteImage(dest_path)) # Service should handle truth, reload data
-                self.load_note_data() # Reload to get updated image list
-            except Exception as e: QMessageBox.critical(self, "Error", f"Could not copy image: {e}")
+            # Hashing and copying run in the background, identical images share one file
+            self.async_note_service.import_image(
+                self.note.id, file_path, self.user_folder_manager,
+                on_result=self.on_image_imported,
+                on_error=lambda e: QMessageBox.critical(self, "Error", f"Could not copy image: {e}"),
+                context=self
+            )
+
+    def on_image_imported(self, stored_path: str):
+        # Start building the thumbnail right away, in parallel with the reload
+        self.thumbnail_loader.request(stored_path)
+        self.load_note_data()
+
+    def on_thumbnail_ready(self, image_path: str, pixmap: Optional[QPixmap]):
+        for thumbnail in self.image_thumbnails.pop(image_path, []):
+            if not sip.isdeleted(thumbnail):
+                thumbnail.set_thumbnail(pixmap)
 
     def confirm_delete_image(self, image_path_to_delete):
         if QMessageBox.question(self, 'Delete Image', 'Are you sure?', QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes:
-            try:
-                self.note_service.remove_image_from_note(self.note.id, image_path_to_delete)
-                if os.path.exists(image_path_to_delete): os.remove(image_path_to_delete)
-                # self.note.image_paths = [img for img in self.note.image_paths if img.image_path != image_path_to_delete]
-                self.load_note_data() # Reload
-            except Exception as e: QMessageBox.warning(self, "Error", f"Could not delete image: {e}")
+            # The file itself is only deleted once no other note uses it
+            self.async_note_service.remove_image_from_note(
+                self.note.id, image_path_to_delete,
+                on_result=lambda _: self.load_note_data(),
+                on_error=lambda e: QMessageBox.warning(self, "Error", f"Could not delete image: {e}"),
+                context=self
+            )
 
     def toggle_audio_recording(self):
         if self.audio_recorder and self.audio_recorder.is_recording:
+            recording_path = self.audio_recorder.output_path
             output_path = self.audio_recorder.stop_recording()
             self.audio_recorder = None
             if output_path:
-                self.note_service.add_audio_to_note(self.note.id, output_path)
-                # self.note.audio_paths.append(NoteAudio(output_path)) 
-                self.load_note_data() # Reload
+                # Moves the finished recording into the media store under its hash
+                self.async_note_service.import_audio(
+                    self.note.id, output_path, self.user_folder_manager,
+                    on_result=lambda _: self.load_note_data(),
+                    on_error=lambda e: QMessageBox.critical(self, "Error", f"Could not save recording: {e}"),
+                    context=self
+                )
+            elif os.path.exists(recording_path):
+                os.remove(recording_path)
             self.record_button.setText("🎙️ Start Recording")
             self.record_button.setStyleSheet("QPushButton { background: #f8f9fa; color: #495057; border: 1px solid #ddd; border-radius: 5px; padding: 8px 15px; font-size: 14px; } QPushButton:hover { background: #e9ecef; }")
         else:
@@ -585,10 +745,8 @@ class NoteWindow(QMainWindow):
             if self.audio_recorder : 
                 if self.audio_recorder.audio_interface: self.audio_recorder.audio_interface.terminate()
 
-            audio_dir = self.user_folder_manager.get_audio_path()
-            os.makedirs(audio_dir, exist_ok=True)
-            filename = f"audio_{int(time.time())}.wav"
-            output_path = os.path.join(audio_dir, filename)
+            # Recorded under a temporary name, stored by content hash when stopped
+            output_path = MediaStore.temp_path(self.user_folder_manager.get_audio_path(), ".wav")
             self.audio_recorder = AudioRecorder(output_path)
             self.audio_recorder.start_recording()
             QTimer.singleShot(200, self._update_record_button_on_status_change)
@@ -603,6 +761,7 @@ class NoteWindow(QMainWindow):
             self.record_button.setStyleSheet("QPushButton { background: #f8f9fa; color: #495057; border: 1px solid #ddd; border-radius: 5px; padding: 8px 15px; font-size: 14px; } QPushButton:hover { background: #e9ecef; }")
             if self.audio_recorder : 
                 if self.audio_recorder.audio_interface : self.audio_recorder.audio_interface.terminate()
+                if os.path.exists(self.audio_recorder.output_path): os.remove(self.audio_recorder.output_path)
                 self.audio_recorder = None
 
 
@@ -621,23 +780,44 @@ class NoteWindow(QMainWindow):
             if self.audio_player and self.audio_player.audio_path == audio_path_to_delete and self.audio_player.is_playing:
                 self.audio_player.stop()
                 self.audio_player = None
-            try:
-                self.note_service.remove_audio_from_note(self.note.id, audio_path_to_delete) 
-                if os.path.exists(audio_path_to_delete): os.remove(audio_path_to_delete)
-                # self.note.audio_paths = [aud for aud in self.note.audio_paths if aud.audio_path != audio_path_to_delete]
-                self.load_note_data() # Reload
-            except Exception as e: QMessageBox.warning(self, "Error", f"Could not delete audio: {e}")
+            self.async_note_service.remove_audio_from_note(
+                self.note.id, audio_path_to_delete,
+                on_result=lambda _: self.load_note_data(),
+                on_error=lambda e: QMessageBox.warning(self, "Error", f"Could not delete audio: {e}"),
+                context=self
+            )
 
 
     def handle_save_note(self):
+        self.save_note_content(
+            on_result=lambda _: QMessageBox.information(self, "Note Saved", "Note saved successfully!")
+        )
+
+    def save_note_content(self, on_result=None):
         self.note.text_content = self.text_editor.toPlainText()
-        self.note_service.update_note_content(self.note.id, self.note.text_content)
-        QMessageBox.information(self, "Note Saved", "Note saved successfully!")
+        self.saved_text = self.note.text_content
+        self.async_note_service.update_note_content(
+            self.note.id, self.note.text_content, on_result=on_result,
+            on_error=self.show_save_error,
+            context=self
+        )
+
+    def show_save_error(self, error):
+        self.saved_text = None # Unknown now, the next close saves again
+        QMessageBox.critical(None, "Error", f"Could not save note: {error}")
+
+    def save_changed_content(self):
+        # Saving bumps updated_at and moves the note to the top of the home
+        # grid, so a note that was only looked at is left alone
+        if self.text_editor.toPlainText() != self.saved_text:
+            self.save_note_content()
 
     def _cleanup_media_resources_on_close(self):
         if self.audio_recorder:
             if self.audio_recorder.is_recording: self.audio_recorder.stop_recording()
             elif self.audio_recorder.audio_interface: self.audio_recorder.audio_interface.terminate()
+            # A recording still in progress on close is discarded, drop its temp file
+            if os.path.exists(self.audio_recorder.output_path): os.remove(self.audio_recorder.output_path)
             self.audio_recorder = None
         if self.audio_player:
             if self.audio_player.is_playing: self.audio_player.stop()
@@ -645,11 +825,10 @@ class NoteWindow(QMainWindow):
             self.audio_player = None
 
     def handle_save_and_close(self):
-        self.handle_save_note()
+        self.save_changed_content() # The home grid updates its card from the change notification
         self._cleanup_media_resources_on_close()
         self.hide()
         if self.home_window_ref:
-            self.home_window_ref.load_notes()
             self.home_window_ref.show()
         self.deleteLater()
 
@@ -664,10 +843,9 @@ class NoteWindow(QMainWindow):
             event.accept()
 
     def closeEvent(self, event): 
-        self.handle_save_note()
+        self.save_changed_content()
         self._cleanup_media_resources_on_close()
         if self.home_window_ref and not self.home_window_ref.isVisible():
-             self.home_window_ref.load_notes()
              self.home_window_ref.show()
         event.accept()
 
@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import QPushButton, QLineEdit
-from PyQt5.QtGui import QFont, QIcon # Added QIcon
+from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt, QSize   # Added QSize
+from src.ui.asset_cache import load_icon
 
 
 class ModernButton(QPushButton):
@@ -15,9 +16,8 @@ class ModernButton(QPushButton):
         icon_style_qss = "" # For QSS specific icon styling if needed
 
         if icon_path and hasattr(self, 'setIcon'): # Check if setIcon method exists (it should for QPushButton)
-            import os
-            if os.path.exists(icon_path):
-                qt_icon = QIcon(icon_path)
+            qt_icon = load_icon(icon_path)
+            if qt_icon is not None:
                 self.setIcon(qt_icon)
                 self.setIconSize(QSize(18, 18)) # Default icon size
                 # Adjust padding if icon is present.
@@ -25,8 +25,6 @@ class ModernButton(QPushButton):
                 # This might need to be fine-tuned based on how text-align works with icons.
                 base_style_padding = "padding-left: 15px; padding-right: 15px;"
                 # icon_style_qss = "icon-size: 18px 18px;" # Can be added to common_style if needed
-            else:
-                print(f"Warning: Icon path not found: {icon_path}")
 
         common_style = f"""
             border-radius: 22px;
@@ -1,4 +1,3 @@
-import os
 from PyQt5.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -10,9 +9,10 @@ from PyQt5.QtWidgets import (
     QLineEdit,  # Added QLineEdit
 )
 from PyQt5.QtCore import Qt, QPoint, QTimer
-from PyQt5.QtGui import QFont, QPixmap, QColor
+from PyQt5.QtGui import QFont, QColor
 
 from src.ui.shared_ui_components import ModernButton, ModernLineEdit
+from src.ui.asset_cache import asset_path, load_pixmap
 from src.services.user_service import UserService
 from src.ui.base_window import BaseWindow
 from src.ui.styles import signup_window_styles as styles
@@ -54,25 +54,12 @@ class SignUpWindow(BaseWindow):
         logo_layout.setAlignment(Qt.AlignCenter)
         logo_layout.setSpacing(20)
 
-        assets_dir = os.path.join(os.path.dirname(__file__), "assets")
-        note_icon_path = os.path.join(assets_dir, "note.png")
-
         app_icon_label = QLabel()
-        if os.path.exists(note_icon_path):
-            pixmap = QPixmap(note_icon_path)
-            if pixmap.isNull():
-                print(f"Warning: Could not load {note_icon_path}. Using fallback emoji.")
-                app_icon_label.setText("📝")
-                app_icon_label.setStyleSheet(styles.APP_ICON_LABEL_STYLE_EMOJI)
-            else:
-                scaled_pixmap = pixmap.scaled(
-                    120, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation
-                )
-                app_icon_label.setPixmap(scaled_pixmap)
-                app_icon_label.setStyleSheet(styles.APP_ICON_LABEL_STYLE_IMAGE)
+        scaled_pixmap = load_pixmap(asset_path("note.png"), 120)
+        if scaled_pixmap is not None:
+            app_icon_label.setPixmap(scaled_pixmap)
+            app_icon_label.setStyleSheet(styles.APP_ICON_LABEL_STYLE_IMAGE)
         else:
-            # This print statement is the one you are seeing in the console
-            print(f"Note: {os.path.join(os.path.dirname(__file__), 'assets', 'note.png')} not found. Using fallback emoji.")
             app_icon_label.setText("📝")
             app_icon_label.setStyleSheet(styles.APP_ICON_LABEL_STYLE_EMOJI)
 
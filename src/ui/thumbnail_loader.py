@@ -0,0 +1,84 @@
+from typing import Dict, Optional, Set
+from PyQt5.QtCore import QCoreApplication, QObject, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from src.services.thumbnail_cache import ThumbnailCache
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, object)  # image path, QImage or None
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, image_path: str, thumbnail_cache: ThumbnailCache, signals: _ThumbnailSignals):
+        super().__init__()
+        self.image_path = image_path
+        self.thumbnail_cache = thumbnail_cache
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = self.thumbnail_cache.get_or_create(self.image_path)
+        except Exception as e:
+            print(f"Could not load thumbnail for {self.image_path}: {e}")
+            image = None
+        try:
+            self.signals.loaded.emit(self.image_path, image)
+        except RuntimeError:
+            pass  # The window closed while this was decoding
+
+
+class ThumbnailLoader(QObject):
+    """
+    Decodes thumbnails on a thread pool of its own, separate from the note
+    database worker, and hands them back to the UI thread as QPixmaps via
+    thumbnail_ready. Finished pixmaps are kept for the loader's lifetime, so
+    rebuilding a grid after an add or delete does not decode anything again.
+    """
+
+    thumbnail_ready = pyqtSignal(str, object)  # image path, QPixmap or None
+
+    def __init__(self, thumbnail_cache: ThumbnailCache, max_threads: Optional[int] = None,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.thumbnail_cache = thumbnail_cache
+        self.thread_pool = QThreadPool(self)
+        # Leave a core for the UI thread
+        self.thread_pool.setMaxThreadCount(max_threads or max(1, QThread.idealThreadCount() - 1))
+        self._pixmaps: Dict[str, Optional[QPixmap]] = {}
+        self._in_flight: Set[str] = set()
+        self._signals = _ThumbnailSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def request(self, image_path: str) -> bool:
+        """
+        Ask for the thumbnail of image_path. Returns True if it is already
+        available through pixmap(), otherwise thumbnail_ready fires later.
+        """
+        if image_path in self._pixmaps:
+            return True
+        if image_path not in self._in_flight:
+            self._in_flight.add(image_path)
+            self.thread_pool.start(_ThumbnailTask(image_path, self.thumbnail_cache, self._signals))
+        return False
+
+    def pixmap(self, image_path: str) -> Optional[QPixmap]:
+        return self._pixmaps.get(image_path)
+
+    def forget(self, image_path: str):
+        self._pixmaps.pop(image_path, None)
+
+    def shutdown(self):
+        # Drop what has not started, wait for what has
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone()
+
+    def _on_loaded(self, image_path: str, image):
+        self._in_flight.discard(image_path)
+        # QPixmap may only be created on the UI thread
+        pixmap = QPixmap.fromImage(image) if image is not None else None
+        self._pixmaps[image_path] = pixmap
+        self.thumbnail_ready.emit(image_path, pixmap)
@@ -0,0 +1,133 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+pytest.importorskip("PyQt5.QtWidgets")
+pytest.importorskip("pyaudio")  # Imported by note_window for recording
+
+from PyQt5.QtCore import QPointF
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication, QMessageBox
+from src.ui.note_window import CanvasWidget
+
+
+class RecordingNoteService:
+    """
+    Stands in for AsyncNoteService: keeps the strokes the canvas saves and
+    answers each call right away, failing it with error when one is set
+    """
+
+    def __init__(self):
+        self.saved = []
+        self.error = None
+
+    def add_stroke_to_note(self, note_id, stroke, on_result=None, on_error=None, context=None):
+        if self.error:
+            on_error(self.error)
+            return
+        stroke.id = len(self.saved) + 1
+        self.saved.append(stroke)
+        if on_result:
+            on_result(stroke)
+
+    def clear_sketch_points_for_note(self, note_id, on_result=None, on_error=None, context=None):
+        if self.error:
+            on_error(self.error)
+            return
+        self.saved = []
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def canvas(app):
+    canvas = CanvasWidget(1, RecordingNoteService(), [])
+    canvas.resize(400, 300)
+    canvas.resizeEvent(None)
+    yield canvas
+    canvas.deleteLater()
+
+
+@pytest.fixture
+def shown_errors(monkeypatch):
+    errors = []
+    monkeypatch.setattr(QMessageBox, "critical", lambda parent, title, text: errors.append(text))
+    return errors
+
+
+def blank(canvas):
+    image = canvas.pixmap.toImage()
+    image.fill(QColor(255, 255, 255))
+    return image
+
+
+def draw(canvas, points, size, color=QColor(0, 0, 0)):
+    canvas.set_brush_size(size)
+    canvas.set_brush_color(color)
+    canvas.begin_stroke(QPointF(*points[0]))
+    for point in points[1:]:
+        canvas.extend_stroke(QPointF(*point))
+        canvas.flush_pending_input()
+    canvas.end_stroke()
+
+
+def assert_matches_full_redraw(canvas):
+    after_stroke = canvas.pixmap.toImage()
+    canvas.redraw_from_db_points()
+    assert canvas.pixmap.toImage() == after_stroke
+
+
+def test_wobbly_wide_stroke_leaves_no_live_pixels_behind(canvas):
+    # A 30 px brush tolerates 6 px of deviation, so the wobble simplifies
+    # to a straight line along its low side, 6 px short of the live
+    # polyline's far edge
+    wobble = [(50 + 10 * i, 150 + (3 if i % 2 else -3)) for i in range(31)]
+    draw(canvas, wobble, 30)
+
+    assert len(canvas.strokes[0].points) == 2
+    assert_matches_full_redraw(canvas)
+
+
+def test_overlapping_strokes_match_full_redraw(canvas):
+    draw(canvas, [(40, 40), (200, 60), (360, 40)], 12, QColor(200, 0, 0, 128))
+    draw(canvas, [(60 + 8 * i, 20 + 9 * i + (4 if i % 2 else -4)) for i in range(30)], 24)
+    draw(canvas, [(300, 250)], 8)
+
+    assert len(canvas.async_note_service.saved) == 3
+    assert_matches_full_redraw(canvas)
+
+
+def test_saved_stroke_is_a_copy_that_hands_its_id_back(canvas):
+    draw(canvas, [(10, 10), (100, 100)], 5)
+
+    stroke, saved = canvas.strokes[0], canvas.async_note_service.saved[0]
+    assert saved is not stroke
+    assert saved.points is not stroke.points
+    assert stroke.id == saved.id == 1
+
+
+def test_failed_stroke_save_is_reported_and_taken_off_the_canvas(canvas, shown_errors):
+    canvas.async_note_service.error = OSError("disk full")
+    draw(canvas, [(10, 10), (100, 100)], 5)
+
+    assert shown_errors == ["Could not save drawing: disk full"]
+    assert canvas.strokes == []
+    assert canvas.pixmap.toImage() == blank(canvas)
+
+
+def test_failed_clear_is_reported_and_puts_the_strokes_back(canvas, shown_errors):
+    draw(canvas, [(10, 10), (100, 100)], 5)
+    drawn = canvas.pixmap.toImage()
+    canvas.async_note_service.error = OSError("database is locked")
+    canvas.clear_canvas_content()
+
+    assert shown_errors == ["Could not clear drawing: database is locked"]
+    assert len(canvas.strokes) == 1
+    assert canvas.pixmap.toImage() == drawn
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from src.data.migrations import MIGRATIONS, SCHEMA_VERSION, get_schema_version, migrate
+from src.data.stroke_codec import decode_points
+
+BASELINE = MIGRATIONS[:1]  # The schema the app shipped with before versioning
+CHILD_TABLES = ("images", "audio", "sketch_points", "strokes")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "notes.db"))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def baseline_conn(conn):
+    migrate(conn, BASELINE)
+    conn.execute("INSERT INTO users (id, username, password) VALUES (1, 'alice', 'hash')")
+    conn.execute("INSERT INTO notes (id, user_id, note_name, text_content) VALUES (1, 1, 'First', 'hello')")
+    conn.execute("INSERT INTO notes (id, user_id, note_name, text_content) VALUES (2, 1, 'Second', 'world')")
+    conn.execute("INSERT INTO images (note_id, image_path) VALUES (1, 'a.png')")
+    conn.execute("INSERT INTO audio (note_id, audio_path) VALUES (1, 'a.wav')")
+    conn.commit()
+    return conn
+
+
+def count(conn, table, where="1 = 1", params=()):
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+
+
+def schema(conn):
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+
+def test_baseline_database_is_upgraded_with_indexes_and_cascades(baseline_conn):
+    assert migrate(baseline_conn) == len(BASELINE)
+    assert get_schema_version(baseline_conn) == SCHEMA_VERSION
+
+    for table in CHILD_TABLES:
+        indexes = [row[1] for row in baseline_conn.execute(f"PRAGMA index_list({table})")]
+        assert f"idx_{table}_note_id" in indexes
+        foreign_keys = baseline_conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+        assert [(fk[2], fk[6]) for fk in foreign_keys] == [("notes", "CASCADE")]
+
+    baseline_conn.execute("PRAGMA foreign_keys = ON")
+    baseline_conn.execute("DELETE FROM notes WHERE id = 1")
+    baseline_conn.commit()
+    assert count(baseline_conn, "images") == 0
+    assert count(baseline_conn, "audio") == 0
+    assert count(baseline_conn, "notes") == 1
+
+
+def test_orphaned_child_rows_are_dropped_during_rebuild(baseline_conn):
+    # The baseline never enforced its foreign keys, so children of deleted notes linger
+    baseline_conn.execute("INSERT INTO images (note_id, image_path) VALUES (99, 'orphan.png')")
+    baseline_conn.execute("INSERT INTO audio (note_id, audio_path) VALUES (99, 'orphan.wav')")
+    baseline_conn.execute("""
+        INSERT INTO sketch_points (note_id, x, y, size, red, green, blue, opacity)
+        VALUES (99, 1, 2, 5, 0, 0, 0, 1)
+    """)
+    baseline_conn.commit()
+
+    migrate(baseline_conn)
+
+    assert [row[0] for row in baseline_conn.execute("SELECT image_path FROM images")] == ["a.png"]
+    assert [row[0] for row in baseline_conn.execute("SELECT audio_path FROM audio")] == ["a.wav"]
+    assert count(baseline_conn, "strokes", "note_id = 99") == 0
+    assert baseline_conn.execute("PRAGMA foreign_key_check").fetchall() == []
+
+
+def test_sketch_points_are_converted_to_strokes(baseline_conn):
+    black = (5.0, 0.0, 0.0, 0.0, 1.0)
+    red = (8.0, 1.0, 0.0, 0.0, 0.5)
+    rows = [(1, 10, 20) + black, (1, 11, 21) + black, (1, 30, 40) + red, (2, 1.5, 2.5) + black]
+    baseline_conn.executemany("""
+        INSERT INTO sketch_points (note_id, x, y, size, red, green, blue, opacity)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    baseline_conn.commit()
+
+    migrate(baseline_conn)
+
+    assert count(baseline_conn, "sketch_points") == 0
+    strokes = baseline_conn.execute("""
+        SELECT note_id, size, red, green, blue, opacity, point_count, points
+        FROM strokes ORDER BY note_id, id
+    """).fetchall()
+    assert [(row[0], row[1:6], row[6], decode_points(row[7])) for row in strokes] == [
+        (1, black, 2, [(10.0, 20.0), (11.0, 21.0)]),
+        (1, red, 1, [(30.0, 40.0)]),
+        (2, black, 1, [(1.5, 2.5)]),
+    ]
+
+
+def test_migrating_an_up_to_date_database_changes_nothing(baseline_conn):
+    migrate(baseline_conn)
+    before = schema(baseline_conn)
+    notes_before = baseline_conn.execute("SELECT * FROM notes ORDER BY id").fetchall()
+
+    assert migrate(baseline_conn) == SCHEMA_VERSION
+    assert get_schema_version(baseline_conn) == SCHEMA_VERSION
+    assert schema(baseline_conn) == before
+    assert baseline_conn.execute("SELECT * FROM notes ORDER BY id").fetchall() == notes_before
+
+
+def test_failing_migration_rolls_back_without_bumping_the_version(baseline_conn):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        conn.execute("DELETE FROM images")
+        raise sqlite3.OperationalError("disk on fire")
+
+    baseline_conn.execute("PRAGMA foreign_keys = ON")
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(baseline_conn, BASELINE + [broken])
+
+    assert get_schema_version(baseline_conn) == len(BASELINE)
+    assert count(baseline_conn, "sqlite_master", "name = 'half_done'") == 0
+    assert count(baseline_conn, "images") == 1
+    assert baseline_conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+
+def test_database_from_a_newer_version_is_rejected(conn):
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+
+    with pytest.raises(RuntimeError, match="newer"):
+        migrate(conn)
+
+    assert get_schema_version(conn) == SCHEMA_VERSION + 1
+    assert count(conn, "sqlite_master") == 0
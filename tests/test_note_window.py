@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+pytest.importorskip("PyQt5.QtWidgets")
+pytest.importorskip("pyaudio")  # Imported by note_window for recording
+
+from PyQt5.QtWidgets import QApplication
+from src.data.repository_factory import BACKEND_MEMORY, create_repositories
+from src.services.async_note_service import AsyncNoteService
+from src.services.note_service import NOTE_UPDATED, NoteService
+from src.services.user_folder_manager import UserFolderManager
+from src.ui.note_window import NoteWindow
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def session(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # User folders are created relative to the working directory
+    repositories = create_repositories(BACKEND_MEMORY)
+    user = repositories.user_repository.add_user("reader", "hash")
+    note_service = NoteService(repositories.note_repository)
+    async_note_service = AsyncNoteService(note_service)
+    changes = []
+    note_service.add_listener(changes.append)
+    yield user, note_service, async_note_service, changes
+    async_note_service.wait_for_done()
+    async_note_service.deleteLater()
+
+
+def open_and_close(session, note_id, text=None):
+    user, note_service, async_note_service, _ = session
+    window = NoteWindow(user, note_service.get_note_by_id(note_id, user.id), note_service,
+                        UserFolderManager(user.username), async_note_service=async_note_service)
+    if text is not None:
+        window.text_editor.setPlainText(text)
+    window.handle_save_and_close()
+    async_note_service.wait_for_done()
+    QApplication.processEvents()
+
+
+def listed_ids(session):
+    user, note_service, _, _ = session
+    return [summary.id for summary in note_service.list_note_summaries(user.id).summaries]
+
+
+def test_closing_an_unchanged_note_keeps_its_place(session):
+    user, note_service, _, changes = session
+    older = note_service.create_note(user.id, "Older", "read me")
+    note_service.create_note(user.id, "Newer", "")
+    order = listed_ids(session)
+    changes.clear()
+    time.sleep(1.1)  # updated_at has one second resolution
+
+    open_and_close(session, older.id)
+
+    assert listed_ids(session) == order
+    assert [change for change in changes if change.kind == NOTE_UPDATED] == []
+
+
+def test_closing_an_edited_note_saves_it(session):
+    user, note_service, _, changes = session
+    older = note_service.create_note(user.id, "Older", "read me")
+    newer = note_service.create_note(user.id, "Newer", "")
+    changes.clear()
+    time.sleep(1.1)
+
+    open_and_close(session, older.id, "read me, then edited")
+
+    assert note_service.get_note_by_id(older.id, user.id).text_content == "read me, then edited"
+    assert listed_ids(session) == [older.id, newer.id]
+    assert [change.kind for change in changes] == [NOTE_UPDATED]